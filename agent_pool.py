@@ -0,0 +1,155 @@
+from typing import Callable, Dict, List, Tuple, TypeVar
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from media_kit_agent import MediaKitSearchAgent
+from rate_limiter import RateLimitedTransport, RateLimiter
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PoolKey = Tuple[str, bool, str]
+
+
+def key_hash(openai_api_key: str, firecrawl_api_key: str) -> str:
+    """Stable, non-reversible identifier of an API key pair"""
+    return hashlib.sha256(f"{openai_api_key}\0{firecrawl_api_key}".encode("utf-8")).hexdigest()[:16]
+
+
+class AgentPool:
+    """Ready MediaKitSearchAgent instances keyed by (API key hash, strict_mode, speed tier)"""
+
+    def __init__(self, max_idle_per_key: int = 4, idle_ttl: float = 600, max_connections: int = 64):
+        self.max_idle_per_key = max_idle_per_key
+        self.idle_ttl = idle_ttl
+        # An agent is checked out by one run at a time and gets a fresh agno session
+        # before it is returned, so runs never share conversation state
+        self._idle: Dict[PoolKey, List[Tuple[MediaKitSearchAgent, float]]] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+
+        # Keep-alive clients shared by every pooled agent (the API key travels in headers);
+        # OpenAI requests are rate limited and retried per API key by the transport
+        self.openai_http_client = httpx.Client(
+            transport=RateLimitedTransport(
+                RateLimiter.shared("openai"),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=120,
+                ),
+            ),
+            timeout=httpx.Timeout(600, connect=10),
+        )
+        self.firecrawl_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max_connections)
+        self.firecrawl_session.mount("https://", adapter)
+        self.firecrawl_session.mount("http://", adapter)
+
+    @classmethod
+    def from_env(cls) -> "AgentPool":
+        """Create a pool configured from AGENT_POOL_* environment variables"""
+        return cls(
+            max_idle_per_key=int(os.getenv("AGENT_POOL_MAX_IDLE_PER_KEY", "4")),
+            idle_ttl=float(os.getenv("AGENT_POOL_IDLE_TTL", "600")),
+            max_connections=int(os.getenv("AGENT_POOL_MAX_CONNECTIONS", "64")),
+        )
+
+    def acquire(
+        self, openai_api_key: str, firecrawl_api_key: str, strict_mode: bool, speed: str = "quality"
+    ) -> MediaKitSearchAgent:
+        """Check out an idle agent for the key pair, mode and speed tier, or build a new one"""
+        key = (key_hash(openai_api_key, firecrawl_api_key), strict_mode, speed)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                agent, _ = idle.pop()
+                self._reused += 1
+                return agent
+            self._created += 1
+
+        logger.info(f"[AGENT POOL] Creating agent for key {key[0]} (strict={strict_mode}, speed={speed})")
+        return MediaKitSearchAgent(
+            openai_api_key=openai_api_key,
+            firecrawl_api_key=firecrawl_api_key,
+            strict_mode=strict_mode,
+            http_client=self.openai_http_client,
+            firecrawl_session=self.firecrawl_session,
+            speed=speed,
+        )
+
+    def release(self, agent: MediaKitSearchAgent) -> None:
+        """Reset the agent's session and return it to the pool"""
+        try:
+            agent.reset()
+        except Exception as e:
+            logger.warning(f"[AGENT POOL] Dropping agent that failed to reset: {e}")
+            return
+
+        key = (key_hash(agent.openai_api_key, agent.firecrawl_api_key), agent.strict_mode, agent.speed)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append((agent, time.monotonic()))
+        self.evict_idle()
+
+    def run(
+        self,
+        openai_api_key: str,
+        firecrawl_api_key: str,
+        strict_mode: bool,
+        func: Callable[[MediaKitSearchAgent], T],
+        speed: str = "quality",
+    ) -> T:
+        """
+        Run func with a pooled agent (blocking; call from the search executor)
+
+        The agent goes back to the pool only after func returns, so a cancelled
+        HTTP request can never hand a still-running agent to another request.
+        """
+        agent = self.acquire(openai_api_key, firecrawl_api_key, strict_mode, speed)
+        try:
+            return func(agent)
+        finally:
+            self.release(agent)
+
+    def evict_idle(self) -> int:
+        """Drop agents that have been idle longer than idle_ttl"""
+        cutoff = time.monotonic() - self.idle_ttl
+        removed = 0
+        with self._lock:
+            for key in list(self._idle):
+                kept = [(agent, last_used) for agent, last_used in self._idle[key] if last_used >= cutoff]
+                removed += len(self._idle[key]) - len(kept)
+                if kept:
+                    self._idle[key] = kept
+                else:
+                    del self._idle[key]
+        if removed:
+            logger.info(f"[AGENT POOL] Evicted {removed} idle agents")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "keys": len(self._idle),
+                "created": self._created,
+                "reused": self._reused,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._idle.clear()
+        self.openai_http_client.close()
+        self.firecrawl_session.close()
@@ -0,0 +1,186 @@
+"""
+Local stand-ins for the OpenAI chat completions API and the Firecrawl v1 API
+
+Run with: uvicorn bench.fake_services:app --port 8101
+The app under test is pointed here with OPENAI_BASE_URL=http://127.0.0.1:8101/v1
+and FIRECRAWL_API_URL=http://127.0.0.1:8101 (see bench/run_bench.py).
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Mean latencies in seconds; each response sleeps mean * (1 +/- jitter)
+LATENCY = {
+    "llm": float(os.getenv("BENCH_LLM_LATENCY", "2.0")),
+    "search": float(os.getenv("BENCH_SEARCH_LATENCY", "1.0")),
+    "scrape": float(os.getenv("BENCH_SCRAPE_LATENCY", "1.5")),
+}
+JITTER = float(os.getenv("BENCH_JITTER", "0.2"))
+SITEMAP_URLS = int(os.getenv("BENCH_SITEMAP_URLS", "5000"))
+# Fraction of model / Firecrawl calls answered with 429 + Retry-After
+THROTTLE_RATE = float(os.getenv("BENCH_THROTTLE_RATE", "0"))
+THROTTLE_RETRY_AFTER = os.getenv("BENCH_THROTTLE_RETRY_AFTER", "1")
+
+with open(os.getenv("BENCH_SCRIPT") or os.path.join(FIXTURES_DIR, "script.json"), encoding="utf-8") as f:
+    SCRIPT = json.load(f)
+with open(os.path.join(FIXTURES_DIR, "search.json"), encoding="utf-8") as f:
+    SEARCH_RESULTS = json.load(f)
+
+app = FastAPI(title="Fake OpenAI / Firecrawl")
+counters = {"chat": 0, "search": 0, "scrape": 0, "pages": 0, "throttled": 0}
+
+
+async def delay(kind: str) -> None:
+    mean = LATENCY[kind]
+    if mean > 0:
+        await asyncio.sleep(max(0.0, random.uniform(mean * (1 - JITTER), mean * (1 + JITTER))))
+
+
+def throttled() -> Optional[Response]:
+    """A 429 response for THROTTLE_RATE of the calls"""
+    if THROTTLE_RATE <= 0 or random.random() >= THROTTLE_RATE:
+        return None
+    counters["throttled"] += 1
+    return JSONResponse(
+        {"success": False, "error": {"message": "Rate limit reached", "type": "rate_limit_exceeded", "code": "rate_limit_exceeded"}},
+        status_code=429,
+        headers={"Retry-After": THROTTLE_RETRY_AFTER},
+    )
+
+
+def fill(value: Any, replacements: Dict[str, str]) -> Any:
+    """Substitute {media_name} / {base_url} placeholders in strings of a fixture"""
+    if isinstance(value, str):
+        for placeholder, replacement in replacements.items():
+            value = value.replace(placeholder, replacement)
+        return value
+    if isinstance(value, list):
+        return [fill(item, replacements) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, replacements) for key, item in value.items()}
+    return value
+
+
+def base_url(request: Request) -> str:
+    return str(request.base_url).rstrip("/")
+
+
+def page_markdown(url: str) -> str:
+    slug = url.rstrip("/").rsplit("/", 1)[-1]
+    path = os.path.join(FIXTURES_DIR, "pages", f"{slug}.md")
+    if not os.path.exists(path):
+        path = os.path.join(FIXTURES_DIR, "pages", "home.md")
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Replay the scripted turn matching the number of assistant messages so far"""
+    body = await request.json()
+    if (response := throttled()) is not None:
+        return response
+    counters["chat"] += 1
+    messages: List[Dict[str, Any]] = body.get("messages", [])
+    user_messages = [m for m in messages if m.get("role") == "user"]
+    # The media name is the first line of the first user message (later lines are seeded evidence)
+    media_name = str(user_messages[0].get("content", "")).split("\n", 1)[0] if user_messages else ""
+    turn_index = min(sum(1 for m in messages if m.get("role") == "assistant"), len(SCRIPT["turns"]) - 1)
+    turn = fill(SCRIPT["turns"][turn_index], {"{media_name}": media_name, "{base_url}": base_url(request)})
+
+    await delay("llm")
+    if turn.get("tool_calls"):
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": json.dumps(call["arguments"], ensure_ascii=False)},
+                }
+                for call in turn["tool_calls"]
+            ],
+        }
+        finish_reason = "tool_calls"
+    else:
+        message = {"role": "assistant", "content": turn["content"]}
+        finish_reason = "stop"
+
+    usage = SCRIPT.get("usage", {"prompt_tokens": 1000, "completion_tokens": 100})
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "o3"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {**usage, "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"]},
+    }
+
+
+@app.post("/v1/search")
+async def firecrawl_search(request: Request):
+    body = await request.json()
+    if (response := throttled()) is not None:
+        return response
+    counters["search"] += 1
+    await delay("search")
+    query = body.get("query", "")
+    media_name = query.split(" ")[0] if query else ""
+    results = fill(SEARCH_RESULTS, {"{media_name}": media_name, "{base_url}": base_url(request)})
+    return {"success": True, "data": results[:int(body.get("limit") or 5)]}
+
+
+@app.post("/v1/scrape")
+async def firecrawl_scrape(request: Request):
+    body = await request.json()
+    if (response := throttled()) is not None:
+        return response
+    counters["scrape"] += 1
+    await delay("scrape")
+    url = body.get("url", "")
+    return {
+        "success": True,
+        "data": {
+            "markdown": page_markdown(url),
+            "metadata": {"title": "Example Media", "sourceURL": url, "url": url, "statusCode": 200},
+        },
+    }
+
+
+@app.get("/pages/{slug}")
+async def page(slug: str):
+    """HTML pages for the outlet registry's liveness check"""
+    counters["pages"] += 1
+    return HTMLResponse(f"<html><body><h1>{slug}</h1><p>광고 미디어킷 광고상품 소개서</p></body></html>")
+
+
+@app.get("/robots.txt")
+async def robots(request: Request):
+    return PlainTextResponse(f"User-agent: *\nAllow: /\nSitemap: {base_url(request)}/sitemap.xml\n")
+
+
+@app.get("/sitemap.xml")
+async def sitemap(request: Request):
+    root = base_url(request)
+    urls = [f"{root}/article/{i}" for i in range(SITEMAP_URLS)]
+    urls += [f"{root}/pages/company", f"{root}/pages/mediakit", f"{root}/ad/rate-card"]
+    body = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    return Response(
+        f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{body}</urlset>',
+        media_type="application/xml",
+    )
+
+
+@app.get("/stats")
+async def stats():
+    """Number of calls served per fake endpoint"""
+    return {"counters": counters, "latency": LATENCY, "jitter": JITTER, "throttle_rate": THROTTLE_RATE}
@@ -0,0 +1,274 @@
+"""
+Offline load test of the Media Kit Search API
+
+Starts bench/fake_services.py and the app (gunicorn + uvicorn workers, like production)
+against it, sends --requests searches with --concurrency in flight and reports
+p50/p95/p99 latency, requests/sec and peak RSS per worker.
+
+    python bench/run_bench.py --requests 200 --concurrency 16 --output before.json
+    python bench/run_bench.py --requests 200 --concurrency 16 --compare before.json
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def child_pids(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+class MemorySampler(threading.Thread):
+    """Samples the RSS of the gunicorn workers (Linux /proc) until stopped"""
+
+    def __init__(self, master_pid: int, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peak_kb: Dict[int, int] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            for pid in child_pids(self.master_pid):
+                rss = rss_kb(pid)
+                if rss is not None:
+                    self.peak_kb[pid] = max(self.peak_kb.get(pid, 0), rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def wait_until_up(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def start_services(args: argparse.Namespace, data_dir: str, log) -> List[subprocess.Popen]:
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    fake_env = {
+        **os.environ,
+        "BENCH_LLM_LATENCY": str(args.llm_latency),
+        "BENCH_SEARCH_LATENCY": str(args.search_latency),
+        "BENCH_SCRAPE_LATENCY": str(args.scrape_latency),
+        "BENCH_JITTER": str(args.jitter),
+        "BENCH_THROTTLE_RATE": str(args.throttle_rate),
+    }
+    if args.script:
+        fake_env["BENCH_SCRIPT"] = os.path.abspath(args.script)
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench.fake_services:app", "--port", str(args.fake_port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=fake_env, stdout=log, stderr=log,
+    )
+    wait_until_up(f"{fake_url}/stats")
+
+    app_env = {
+        **os.environ,
+        "OPENAI_BASE_URL": f"{fake_url}/v1",
+        "FIRECRAWL_API_URL": fake_url,
+        "MEDIA_KIT_DATA_DIR": data_dir,
+        # The fake sites live on localhost, which the URL guard refuses otherwise
+        "URL_GUARD_ALLOWED_HOSTS": "127.0.0.1,localhost",
+    }
+    if args.cold_tools:
+        # Every tool call reaches the fake Firecrawl (no tool cache hits across requests)
+        app_env.update({"TOOL_CACHE_TTL_SEARCH": "0", "TOOL_CACHE_TTL_SCRAPE": "0", "TOOL_CACHE_TTL_SITEMAP": "0"})
+    # Same worker model as gunicorn.conf.py, without its port-8000 cleanup hook
+    app = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "main:app",
+            "--worker-class", "uvicorn.workers.UvicornWorker",
+            "--workers", str(args.workers),
+            "--bind", f"127.0.0.1:{args.app_port}",
+            "--timeout", "3600",
+            "--preload",
+        ],
+        cwd=REPO_ROOT, env=app_env, stdout=log, stderr=log,
+    )
+    wait_until_up(f"http://127.0.0.1:{args.app_port}/health")
+    return [fake, app]
+
+
+async def drive(args: argparse.Namespace) -> Dict[str, Any]:
+    url = f"http://127.0.0.1:{args.app_port}/search"
+    names = [f"{args.name_prefix}{i}" for i in range(args.distinct_names)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    samples: List[Dict[str, Any]] = []
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        async def one(i: int) -> None:
+            payload = {
+                "media_name": names[i % len(names)],
+                "openai_api_key": "sk-bench",
+                "firecrawl_api_key": "fc-bench",
+                "strict_mode": not args.flexible,
+                "cache": args.cache,
+                "speed": args.speed,
+            }
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, json=payload)
+                    status, cache = response.status_code, response.headers.get("X-Cache", "-")
+                except httpx.HTTPError as e:
+                    status, cache = type(e).__name__, "-"
+                samples.append({"latency": time.perf_counter() - started, "status": status, "cache": cache})
+
+        if args.warmup:
+            await asyncio.gather(*(one(i) for i in range(args.warmup)))
+            samples.clear()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        wall = time.perf_counter() - started
+
+    latencies = [s["latency"] for s in samples if s["status"] == 200]
+    statuses: Dict[str, int] = {}
+    caches: Dict[str, int] = {}
+    for sample in samples:
+        statuses[str(sample["status"])] = statuses.get(str(sample["status"]), 0) + 1
+        caches[sample["cache"]] = caches.get(sample["cache"], 0) + 1
+    return {
+        "requests": len(samples),
+        "ok": len(latencies),
+        "statuses": statuses,
+        "cache": caches,
+        "wall_s": round(wall, 3),
+        "rps": round(len(samples) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(max(latencies) * 1000, 1) if latencies else 0.0,
+        },
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    def delta(current: float, before: Optional[float]) -> str:
+        if before in (None, 0):
+            return ""
+        return f"  ({(current - before) / before * 100:+.1f}%)"
+
+    before_latency = (baseline or {}).get("latency_ms", {})
+    print(f"requests   {report['requests']} ({report['ok']} ok)  statuses {report['statuses']}  cache {report['cache']}")
+    print(f"throughput {report['rps']} req/s{delta(report['rps'], (baseline or {}).get('rps'))}  wall {report['wall_s']}s")
+    for key in ("mean", "p50", "p95", "p99", "max"):
+        print(f"latency    {key:<4} {report['latency_ms'][key]:>9.1f} ms{delta(report['latency_ms'][key], before_latency.get(key))}")
+    for pid, peak in sorted(report["worker_peak_rss_mb"].items()):
+        print(f"worker     pid {pid} peak RSS {peak} MB")
+    print(f"fake calls {report['fake_calls']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test of /search against fake OpenAI / Firecrawl services")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=0, help="Requests sent (and discarded) before measuring")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers (production uses 2)")
+    parser.add_argument("--cache", choices=["use", "bypass", "refresh"], default="refresh",
+                        help="Request cache mode; refresh (default) always runs the agent")
+    parser.add_argument("--flexible", action="store_true", help="Send strict_mode=false")
+    parser.add_argument("--speed", choices=["quality", "fast"], default="quality", help="Model tier of the requests")
+    parser.add_argument("--distinct-names", type=int, default=50, help="Media names cycled through by the requests")
+    parser.add_argument("--name-prefix", default="벤치매체")
+    parser.add_argument("--cold-tools", action="store_true", help="Disable the Firecrawl tool cache")
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="Mean seconds per fake model call")
+    parser.add_argument("--search-latency", type=float, default=1.0, help="Mean seconds per fake Firecrawl search")
+    parser.add_argument("--scrape-latency", type=float, default=1.5, help="Mean seconds per fake Firecrawl scrape")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter as a fraction of the mean")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of fake API calls answered with 429")
+    parser.add_argument("--script", help="Scripted tool-call sequence (default bench/fixtures/script.json)")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--fake-port", type=int, default=8101)
+    parser.add_argument("--output", help="Write the report as JSON (use it later with --compare)")
+    parser.add_argument("--compare", help="Baseline report JSON to print deltas against")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the temporary data directory")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="media-kit-bench-")
+    log_path = os.path.join(data_dir, "services.log")
+    processes: List[subprocess.Popen] = []
+    with open(log_path, "w") as log:
+        try:
+            processes = start_services(args, data_dir, log)
+            sampler = MemorySampler(processes[1].pid)
+            sampler.start()
+            try:
+                report = asyncio.run(drive(args))
+            finally:
+                sampler.stop()
+            report["worker_peak_rss_mb"] = {pid: round(kb / 1024, 1) for pid, kb in sampler.peak_kb.items()}
+            report["fake_calls"] = httpx.get(f"http://127.0.0.1:{args.fake_port}/stats").json()["counters"]
+            report["config"] = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.keep_data:
+        print(f"data + service logs kept in {data_dir}")
+    else:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,167 @@
-from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional, List, Dict, Any, Tuple
+import contextvars
+import os
+import threading
+import time
 import logging
+import requests
 from agno.tools.toolkit import Toolkit
 from firecrawl import FirecrawlApp
+from firecrawl.firecrawl import ScrapeResponse, SearchResponse, version as firecrawl_version
+
+from page_condenser import DEFAULT_CHAR_BUDGET, condense_markdown, keyword_score
+from rate_limiter import RateLimiter
+from run_context import current_run
+from sitemap_index import SitemapIndexer, site_root
+from tool_cache import ToolCache, normalize_query, normalize_url
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+class PooledFirecrawlApp(FirecrawlApp):
+    """FirecrawlApp whose search / scrape calls reuse a keep-alive requests.Session and are rate limited per API key"""
+
+    # (connect, read) timeout in seconds for Firecrawl API calls
+    REQUEST_TIMEOUT = (10, 180)
+
+    def __init__(
+        self,
+        api_key: str,
+        session: requests.Session,
+        api_url: Optional[str] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        super().__init__(api_key=api_key, api_url=api_url)
+        self.session = session
+        self.limiter = limiter or RateLimiter.shared("firecrawl")
+
+    def _post(self, path: str, params: Dict[str, Any]) -> requests.Response:
+        """POST to the Firecrawl API through the rate limiter (429 / 5xx are retried with backoff)"""
+        return self.limiter.call(
+            self.api_key or "",
+            lambda: self.session.post(
+                f"{self.api_url}{path}",
+                headers=self._prepare_headers(),
+                json=params,
+                timeout=self.REQUEST_TIMEOUT
+            ),
+            retry_exceptions=(requests.ConnectionError,),
+        )
+
+    def search(self, query: str, *, limit: Optional[int] = None, **kwargs) -> SearchResponse:
+        params = {"query": query, "origin": f"python-sdk@{firecrawl_version}", **kwargs}
+        if limit is not None:
+            params["limit"] = limit
+        response = self._post("/v1/search", params)
+        if response.status_code != 200:
+            self._handle_error(response, "search")
+        response_json = response.json()
+        if response_json.get("success") and "data" in response_json:
+            return SearchResponse(**response_json)
+        raise Exception(f'Search failed. Error: {response_json.get("error", response_json)}')
+
+    def scrape_url(self, url: str, formats: Optional[List[str]] = None, **kwargs) -> ScrapeResponse:
+        params = {"url": url, "formats": formats or ["markdown"], "origin": f"python-sdk@{firecrawl_version}", **kwargs}
+        response = self._post("/v1/scrape", params)
+        if response.status_code != 200:
+            self._handle_error(response, "scrape URL")
+        response_json = response.json()
+        if response_json.get("success") and "data" in response_json:
+            return ScrapeResponse(**response_json["data"])
+        raise Exception(f'Failed to scrape URL. Error: {response_json.get("error", response_json)}')
+
+
 class FirecrawlTools(Toolkit):
     """Firecrawl tools for web search and scraping"""
     
-    def __init__(self, api_key: str):
+    # Metadata fields passed on to the model; the rest (og:*, twitter:*, ...) is noise
+    METADATA_FIELDS = ("title", "description", "sourceURL", "url", "statusCode", "contentType")
+
+    # scrape_many limits: URLs per call, seconds to wait for the slowest URL, and the
+    # smallest per-URL share of the character budget
+    SCRAPE_MANY_MAX_URLS = int(os.getenv("SCRAPE_MANY_MAX_URLS", "10"))
+    SCRAPE_MANY_TIMEOUT = float(os.getenv("SCRAPE_MANY_TIMEOUT", "60"))
+    SCRAPE_MANY_MIN_CHARS = 3000
+
+    # Threads shared by all toolkits of the process for scrape_many fan-out
+    _scrape_pool: Optional[ThreadPoolExecutor] = None
+    _scrape_pool_lock = threading.Lock()
+
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[ToolCache] = None,
+        char_budget: int = DEFAULT_CHAR_BUDGET,
+        session: Optional[requests.Session] = None,
+    ):
         super().__init__(name="firecrawl_tools")
-        self.app = FirecrawlApp(api_key=api_key)
+        # Keep-alive session shared with other toolkits when provided
+        self.http = session or requests.Session()
+        self.app = PooledFirecrawlApp(api_key=api_key, session=self.http)
+        # Responses are cached across requests and workers; errors are never cached
+        self.cache = cache or ToolCache.shared()
+        # Maximum characters of scraped markdown handed to the model
+        self.char_budget = char_budget
+        # robots.txt / sitemap.xml are fetched directly (no Firecrawl credits) with a session
+        # that refuses non-public hosts
+        self.sitemap_indexer = SitemapIndexer()
         self.register(self.search)
         self.register(self.scrape)
+        self.register(self.scrape_many)
+        self.register(self.sitemap)
     
+    @staticmethod
+    def _to_dict(response: Any) -> Dict[str, Any]:
+        """Convert a Firecrawl SDK response model into a JSON-serializable dict"""
+        data = response.model_dump(exclude_none=True) if hasattr(response, 'model_dump') else dict(response)
+        # FirecrawlDocument's `json` field shadows BaseModel.json and dumps as a bound method
+        return {key: value for key, value in data.items() if not callable(value)}
+
+    @staticmethod
+    def _cancelled_error(error_type: str) -> Dict[str, Any]:
+        return {
+            "error": True,
+            "message": "Search was cancelled, stop calling tools",
+            "type": error_type
+        }
+
+    @staticmethod
+    def _budget_error(error_type: str, budget: str) -> Dict[str, Any]:
+        return {
+            "error": True,
+            "message": f"Search budget exhausted ({budget}). Stop calling tools and answer now with the best "
+                       f"candidate URL you have verified, or '찾을 수 없음'.",
+            "type": error_type
+        }
+
+    @staticmethod
+    def _error_result(error: Exception, error_type: str) -> Dict[str, Any]:
+        """Error dict for the model; errors that retrying cannot fix say so to save turns"""
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+        if status_code == 429:
+            return {
+                "error": True,
+                "message": "Firecrawl rate limit persisted after retries. Do not retry now; continue with the "
+                           "results you already have.",
+                "type": "rate_limited",
+                "retryable": False
+            }
+        if status_code in (401, 402, 403):
+            return {
+                "error": True,
+                "message": f"Firecrawl rejected the API key or has no credits left ({error}). Further Firecrawl "
+                           f"calls will fail; answer with what you have.",
+                "type": "auth_error",
+                "retryable": False
+            }
+        return {
+            "error": True,
+            "message": str(error),
+            "type": error_type
+        }
+
     def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         Search the web using Firecrawl search API
@@ -27,26 +173,59 @@ class FirecrawlTools(Toolkit):
         Returns:
             List of search results with scraped content
         """
+        run = current_run.get()
+        if run is not None and run.cancelled:
+            return [self._cancelled_error("search_error")]
+        if run is not None and run.check_budget():
+            return [self._budget_error("search_error", run.budget_hit)]
+
+        started = time.perf_counter()
+        results, cached = self._search(query, limit)
+
+        if run is not None:
+            run.tool_calls += 1
+            urls = [result["url"] for result in results if result.get("url")]
+            run.emit(
+                "tool_call",
+                tool="search",
+                query=query,
+                cached=cached,
+                ok=not any(result.get("error") for result in results),
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
+                result_count=len(urls),
+                content_length=sum(len(result.get("markdown") or result.get("description") or "") for result in results),
+            )
+            if urls:
+                run.record_search(query, urls)
+                run.emit("candidates", source="search", urls=urls)
+        return results
+
+    def _search(self, query: str, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """Run a (cached) Firecrawl search; returns (results, served_from_cache)"""
         logger.info(f"[TOOL CALL] Firecrawl search - Query: '{query}', Limit: {limit}")
+        cache_key = self.cache.make_key(normalize_query(query), limit)
+        cached = self.cache.get("search", cache_key)
+        if cached is not None:
+            logger.info(f"[TOOL CACHE] HIT search - Query: '{query}' ({len(cached)} results)")
+            return cached, True
+        logger.info(f"[TOOL CACHE] MISS search - Query: '{query}'")
+
         try:
             results = self.app.search(query, limit=limit)
             if hasattr(results, 'data'):
                 logger.info(f"[TOOL RESPONSE] Found {len(results.data)} search results")
                 for i, result in enumerate(results.data):
                     logger.info(f"  Result {i+1}: {result.get('url', 'No URL')}")
-                return results.data
+                self.cache.set("search", cache_key, results.data)
+                return results.data, False
             logger.warning("[TOOL RESPONSE] No results found")
-            return []
+            return [], False
         except Exception as e:
             error_msg = str(e)
             logger.error(f"[TOOL ERROR] Search error: {error_msg}")
             
             # Return error information instead of empty list
-            return [{
-                "error": True,
-                "message": error_msg,
-                "type": "search_error"
-            }]
+            return [self._error_result(e, "search_error")], False
     
     def scrape(self, url: str) -> Dict[str, Any]:
         """
@@ -59,24 +238,232 @@ class FirecrawlTools(Toolkit):
         Returns:
             Scraped content in requested formats
         """
+        run = current_run.get()
+        if run is not None and run.cancelled:
+            return self._cancelled_error("scrape_error")
+        if run is not None and run.check_budget():
+            return self._budget_error("scrape_error", run.budget_hit)
+
+        started = time.perf_counter()
+        result, cached = self._scrape(url)
+        if not result.get("error"):
+            result = self._condense(url, result)
+
+        if run is not None:
+            run.tool_calls += 1
+            if not result.get("error"):
+                run.record_page(url, result["metadata"].get("title", ""), keyword_score(result.get("markdown") or ""))
+            stats = result.get("condense_stats", {})
+            run.emit(
+                "tool_call",
+                tool="scrape",
+                url=url,
+                cached=cached,
+                ok=not result.get("error"),
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
+                content_length=stats.get("chars_in", 0),
+                condensed_length=stats.get("chars_out", 0),
+            )
+        return result
+
+    def scrape_many(self, urls: List[str]) -> Dict[str, Any]:
+        """
+        Scrape several URLs concurrently and return all results in one response
+        
+        Args:
+            urls: URLs to scrape (at most 10; duplicates are scraped once)
+            
+        Returns:
+            {"results": [...]} with one condensed result or error per URL, in input order
+        """
+        run = current_run.get()
+        if run is not None and run.cancelled:
+            return self._cancelled_error("scrape_error")
+        if run is not None and run.check_budget():
+            return self._budget_error("scrape_error", run.budget_hit)
+
+        urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+        skipped = urls[self.SCRAPE_MANY_MAX_URLS:]
+        urls = urls[:self.SCRAPE_MANY_MAX_URLS]
+        if run is not None and run.max_tool_calls is not None:
+            # Every URL counts as one tool call against the budget
+            allowed = max(run.max_tool_calls - run.tool_calls, 0)
+            skipped = urls[allowed:] + skipped
+            urls = urls[:allowed]
+        # The character budget is shared so one response stays about the size of a single scrape
+        char_budget = max(self.char_budget // max(len(urls), 1), self.SCRAPE_MANY_MIN_CHARS)
+        logger.info(f"[TOOL CALL] Firecrawl scrape_many - {len(urls)} URLs ({len(skipped)} skipped), {char_budget} chars each")
+
+        started = time.perf_counter()
+        pool = self._shared_scrape_pool()
+        # Each task runs in its own copy of the caller's context (request id for logs)
+        futures = {
+            url: pool.submit(contextvars.copy_context().run, self._scrape_one, url, char_budget)
+            for url in urls
+        }
+        wait(futures.values(), timeout=self.SCRAPE_MANY_TIMEOUT)
+
+        results = []
+        for url, future in futures.items():
+            if future.done():
+                result, cached, duration_ms, content_length = future.result()
+            else:
+                # Partial results: the slow scrape keeps running in the background and is cached when it lands
+                logger.warning(f"[TOOL ERROR] scrape_many timed out waiting for {url}")
+                result, cached, duration_ms, content_length = {
+                    "url": url,
+                    "error": True,
+                    "message": f"Timed out after {self.SCRAPE_MANY_TIMEOUT:.0f}s",
+                    "type": "scrape_timeout"
+                }, False, self.SCRAPE_MANY_TIMEOUT * 1000, 0
+            results.append(result)
+
+            if run is not None:
+                run.tool_calls += 1
+                if not result.get("error"):
+                    run.record_page(url, result["metadata"].get("title", ""), keyword_score(result.get("markdown") or ""))
+                run.emit(
+                    "tool_call",
+                    tool="scrape",
+                    url=url,
+                    cached=cached,
+                    ok=not result.get("error"),
+                    duration_ms=round(duration_ms, 1),
+                    content_length=content_length,
+                    condensed_length=len(result.get("markdown") or ""),
+                    batch_size=len(urls),
+                )
+
+        for url in skipped:
+            results.append({
+                "url": url,
+                "error": True,
+                "message": "Not scraped: too many URLs for one call or search budget exhausted",
+                "type": "scrape_skipped"
+            })
+        logger.info(f"[TOOL RESPONSE] scrape_many finished {len(urls)} URLs in {(time.perf_counter() - started):.1f}s")
+        return {"results": results}
+
+    def _scrape_one(self, url: str, char_budget: int) -> Tuple[Dict[str, Any], bool, float, int]:
+        """scrape_many worker: (condensed result or error, cached, duration_ms, raw content length)"""
+        started = time.perf_counter()
+        result, cached = self._scrape(url)
+        content_length = len(result.get("markdown") or "")
+        if result.get("error"):
+            result = {"url": url, **result}
+        else:
+            result = self._condense(url, result, char_budget)
+        return result, cached, (time.perf_counter() - started) * 1000, content_length
+
+    @classmethod
+    def _shared_scrape_pool(cls) -> ThreadPoolExecutor:
+        with cls._scrape_pool_lock:
+            if cls._scrape_pool is None:
+                cls._scrape_pool = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("SCRAPE_MANY_WORKERS", "16")),
+                    thread_name_prefix="scrape-many"
+                )
+            return cls._scrape_pool
+
+    def _condense(self, url: str, result: Dict[str, Any], char_budget: Optional[int] = None) -> Dict[str, Any]:
+        """Replace the page markdown with its ad/media-kit relevant parts"""
+        metadata = result.get("metadata") or {}
+        base_url = metadata.get("sourceURL") or metadata.get("url") or url
+        markdown, stats = condense_markdown(result.get("markdown") or "", base_url=base_url, char_budget=char_budget or self.char_budget)
+        logger.info(
+            f"[TOOL RESPONSE] Condensed {url}: {stats['chars_in']} -> {stats['chars_out']} characters "
+            f"({stats['ad_links']}/{stats['links']} ad links, {stats['blocks_kept']} blocks kept)"
+        )
+        return {
+            "url": result.get("url") or base_url,
+            "metadata": {key: metadata[key] for key in self.METADATA_FIELDS if key in metadata},
+            "markdown": markdown,
+            "condense_stats": stats
+        }
+
+    def _scrape(self, url: str) -> Tuple[Dict[str, Any], bool]:
+        """Run a (cached) Firecrawl scrape; returns (result, served_from_cache)"""
         # Force the format to markdown only, ignoring any external input
         formats = ["markdown"]
 
         logger.info(f"[TOOL CALL] Firecrawl scrape - URL: '{url}', Formats: {formats}")
+        cache_key = self.cache.make_key(normalize_url(url), formats)
+        cached = self.cache.get("scrape", cache_key)
+        if cached is not None:
+            logger.info(f"[TOOL CACHE] HIT scrape - URL: '{url}'")
+            return cached, True
+        logger.info(f"[TOOL CACHE] MISS scrape - URL: '{url}'")
+
         try:
-            result = self.app.scrape_url(url, formats=formats)
+            response = self.app.scrape_url(url, formats=formats)
+            result = self._to_dict(response)
             logger.info(f"[TOOL RESPONSE] Successfully scraped {url}")
             if 'markdown' in result:
                 logger.info(f"  Content length: {len(result['markdown'])} characters")
-            return result
+            self.cache.set("scrape", cache_key, result)
+            return result, False
         except Exception as e:
             error_msg = str(e)
             logger.error(f"[TOOL ERROR] Scrape error: {error_msg}")
             
             # Return error information instead of empty dict
-            return {
-                "error": True,
-                "message": error_msg,
-                "type": "scrape_error"
-            }
-    
\ No newline at end of file
+            return self._error_result(e, "scrape_error"), False
+
+    def sitemap(self, domain: str, top_n: int = 20) -> Dict[str, Any]:
+        """
+        Read a site's robots.txt / sitemap.xml and return the URLs most likely to be ad or media-kit pages
+        
+        Args:
+            domain: Official domain or homepage URL of the media outlet (e.g. "joongang.co.kr")
+            top_n: Maximum number of ranked URLs to return
+            
+        Returns:
+            Ranked sitemap URLs with relevance scores, plus the sitemaps read and total URL count
+        """
+        run = current_run.get()
+        if run is not None and run.cancelled:
+            return self._cancelled_error("sitemap_error")
+        if run is not None and run.check_budget():
+            return self._budget_error("sitemap_error", run.budget_hit)
+
+        started = time.perf_counter()
+        root = site_root(domain)
+        logger.info(f"[TOOL CALL] Sitemap - Domain: '{root}', Top: {top_n}")
+
+        cache_key = self.cache.make_key(root)
+        index = self.cache.get("sitemap", cache_key)
+        cached = index is not None
+        if cached:
+            logger.info(f"[TOOL CACHE] HIT sitemap - Domain: '{root}'")
+        else:
+            logger.info(f"[TOOL CACHE] MISS sitemap - Domain: '{root}'")
+            try:
+                index = self.sitemap_indexer.build(root)
+            except Exception as e:
+                logger.error(f"[TOOL ERROR] Sitemap error: {str(e)}")
+                return {
+                    "error": True,
+                    "message": str(e),
+                    "type": "sitemap_error"
+                }
+            # An empty index usually means the site blocks us right now; do not pin that
+            if index["total_urls"]:
+                self.cache.set("sitemap", cache_key, index)
+
+        result = {**index, "urls": index["urls"][:top_n]}
+        logger.info(f"[TOOL RESPONSE] Sitemap {root}: {len(result['urls'])} of {index['total_urls']} URLs returned")
+
+        if run is not None:
+            run.tool_calls += 1
+            run.emit(
+                "tool_call",
+                tool="sitemap",
+                url=root,
+                cached=cached,
+                ok=True,
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
+                result_count=len(result["urls"]),
+            )
+            if result["urls"]:
+                run.emit("candidates", source="sitemap", urls=[item["url"] for item in result["urls"]])
+        return result
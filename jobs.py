@@ -0,0 +1,193 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+
+from storage import SQLiteStore, data_path, pid_alive
+from tracing import request_id
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue of this worker is full"""
+
+
+class JobStore:
+    """Persistent job table shared by all gunicorn workers (API keys are never stored)"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        media_name TEXT NOT NULL,
+        strict_mode INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        owner_pid INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+    """
+
+    def __init__(self, path: str):
+        self.store = SQLiteStore(path, self.schema)
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        return cls(os.getenv("JOB_STORE_PATH") or data_path("jobs.sqlite3"))
+
+    def create(self, media_name: str, strict_mode: bool) -> str:
+        """Insert a queued job owned by this process and return its id"""
+        job_id = uuid.uuid4().hex
+        self.store.connection().execute(
+            "INSERT INTO jobs (id, media_name, strict_mode, status, owner_pid, created_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, media_name, int(strict_mode), os.getpid(), time.time()),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.store.connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["strict_mode"] = bool(job["strict_mode"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def mark_running(self, job_id: str) -> None:
+        self.store.connection().execute(
+            "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+            (time.time(), job_id),
+        )
+
+    def mark_succeeded(self, job_id: str, result: Dict[str, str]) -> None:
+        self.store.connection().execute(
+            "UPDATE jobs SET status = 'succeeded', result = ?, finished_at = ? WHERE id = ?",
+            (json.dumps(result, ensure_ascii=False), time.time(), job_id),
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self.store.connection().execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+            (error, time.time(), job_id),
+        )
+
+    def fail_unfinished(self, error: str, owner_pid: Optional[int] = None) -> int:
+        """
+        Fail queued/running jobs whose owner can no longer run them
+
+        Args:
+            error: Error message stored on the failed jobs
+            owner_pid: Only fail jobs of this process; by default fail jobs of dead processes
+
+        Returns:
+            Number of jobs marked as failed
+        """
+        conn = self.store.connection()
+        rows = conn.execute(
+            "SELECT id, owner_pid FROM jobs WHERE status IN ('queued', 'running')"
+        ).fetchall()
+        if owner_pid is not None:
+            job_ids = [row["id"] for row in rows if row["owner_pid"] == owner_pid]
+        else:
+            job_ids = [row["id"] for row in rows if not pid_alive(row["owner_pid"])]
+        for job_id in job_ids:
+            self.mark_failed(job_id, error)
+        return len(job_ids)
+
+    def purge_finished(self, older_than: float) -> int:
+        """Delete finished jobs older than the given number of seconds"""
+        cursor = self.store.connection().execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+            (time.time() - older_than,),
+        )
+        return cursor.rowcount
+
+
+class JobWorkerPool:
+    """Fixed number of asyncio workers draining this process's job queue"""
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, str]]],
+        concurrency: int = 8,
+        max_queue: int = 1000,
+    ):
+        self.store = store
+        self.handler = handler
+        self.concurrency = concurrency
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queue)
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Recover jobs left behind by dead workers and start draining the queue"""
+        interrupted = self.store.fail_unfinished("에러: Job interrupted by a server restart, please resubmit")
+        if interrupted:
+            logger.warning(f"[JOBS] Marked {interrupted} interrupted jobs as failed")
+        self.store.purge_finished(float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600))))
+        self._tasks = [asyncio.create_task(self._work(i)) for i in range(self.concurrency)]
+        logger.info(f"[JOBS] Started {self.concurrency} job workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.fail_unfinished("에러: Job interrupted by a server shutdown, please resubmit", owner_pid=os.getpid())
+
+    async def submit(self, media_name: str, strict_mode: bool, payload: Dict[str, Any]) -> str:
+        """
+        Persist a job and queue it for this process's workers
+
+        Args:
+            media_name: Stripped media name
+            strict_mode: Search mode
+            payload: Handler arguments kept in memory only (includes API keys)
+
+        Returns:
+            The new job id
+
+        Raises:
+            JobQueueFullError: If the in-process queue is full
+        """
+        if self._queue.full():
+            raise JobQueueFullError(f"Job queue is full ({self._queue.qsize()} jobs waiting)")
+        # Job store calls (SQLite, busy timeout up to 30s) run off the event loop
+        job_id = await asyncio.to_thread(self.store.create, media_name, strict_mode)
+        try:
+            self._queue.put_nowait({"job_id": job_id, **payload})
+        except asyncio.QueueFull:
+            # Filled up by other submissions while the job was being stored
+            await asyncio.to_thread(self.store.mark_failed, job_id, "에러: Job queue is full, please resubmit")
+            raise JobQueueFullError(f"Job queue is full ({self._queue.qsize()} jobs waiting)")
+        return job_id
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": len(self._tasks), "queued": self._queue.qsize()}
+
+    async def _work(self, worker_id: int) -> None:
+        while True:
+            job = await self._queue.get()
+            job_id = job.pop("job_id")
+            # Log lines of this search carry the job id
+            request_id.set(job_id)
+            try:
+                await asyncio.to_thread(self.store.mark_running, job_id)
+                logger.info(f"[JOBS] Worker {worker_id} running job {job_id}")
+                result = await self.handler(job)
+                await asyncio.to_thread(self.store.mark_succeeded, job_id, result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[JOBS] Job {job_id} failed: {e}")
+                await asyncio.to_thread(self.store.mark_failed, job_id, f"에러: {e}")
+            finally:
+                self._queue.task_done()
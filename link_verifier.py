@@ -0,0 +1,246 @@
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+import codecs
+import logging
+import os
+import re
+import threading
+import time
+
+import requests
+
+from page_condenser import keyword_score
+from tool_cache import ToolCache, normalize_url
+from url_guard import UnsafeURLError, guarded_session
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; MediaKitSearchBot/1.0)"
+
+# Content types that are a media kit file by themselves
+DOCUMENT_CONTENT_TYPES = (
+    "application/pdf", "powerpoint", "presentationml", "application/zip", "application/x-zip",
+    "hwp", "msword", "wordprocessingml", "ms-excel", "spreadsheetml",
+)
+DOCUMENT_EXTENSIONS = (".pdf", ".ppt", ".pptx", ".zip", ".hwp", ".hwpx", ".doc", ".docx", ".xls", ".xlsx")
+# Download handlers used by Korean CMSes (board file downloads, attachment servlets, ...)
+DOWNLOAD_MARKERS = ("download", "filedown", "file_down", "fileDown", "attach", "getfile", "get_file")
+
+# Explicit not-found wording; a bare "404" is not enough (article ids, phone numbers, "404호")
+SOFT_404_PHRASES = (
+    "not found", "페이지를 찾을 수 없", "존재하지 않는 페이지", "요청하신 페이지", "삭제되었거나", "잘못된 접근",
+    "page you requested", "does not exist",
+)
+
+LINK_ATTRIBUTE_PATTERN = re.compile(r"""(?:href|src|data-href|data-url)\s*=\s*["']([^"'#]+)["']""", re.I)
+# Links hidden in onclick="fnDownload('/files/kit.pdf')" style handlers
+SCRIPT_LINK_PATTERN = re.compile(r"""["']([^"'\s]+\.(?:pdf|pptx?|zip|hwpx?|docx?|xlsx?))["']""", re.I)
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+TAG_PATTERN = re.compile(r"<script.*?</script>|<style.*?</style>|<[^>]+>", re.I | re.S)
+META_CHARSET_PATTERN = re.compile(rb"""charset\s*=\s*["']?([\w-]+)""", re.I)
+
+
+def is_document_url(url: str) -> bool:
+    """Whether the URL path ends in a document extension"""
+    return urlsplit(url).path.lower().endswith(DOCUMENT_EXTENSIONS)
+
+
+def is_attachment_link(url: str) -> bool:
+    """Whether a link on a page points at a downloadable file"""
+    return is_document_url(url) or any(marker.lower() in url.lower() for marker in DOWNLOAD_MARKERS)
+
+
+class LinkVerifier:
+    """HEAD / ranged GET checks that a media-kit URL is alive and offers a file, without the model or Firecrawl"""
+
+    # Verdicts: "verified" (a file, or a page linking files), "unconfirmed" (alive but no file
+    # detected, or the site could not be checked) and "dead" (404/410, soft-404, or a non-public host)
+    VERIFIED = "verified"
+    UNCONFIRMED = "unconfirmed"
+    DEAD = "dead"
+
+    # Inconclusive checks (timeouts, 5xx, bot blocking) are retried sooner than definite ones
+    INCONCLUSIVE_TTL = 600
+
+    _shared: Optional["LinkVerifier"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        cache: Optional[ToolCache] = None,
+        timeout: float = 8,
+        max_page_bytes: int = 512 * 1024,
+    ):
+        # Answers and registry URLs are untrusted: only public hosts are requested, redirects included
+        self.session = session or guarded_session()
+        self.cache = cache or ToolCache.shared()
+        self.timeout = timeout
+        # Only the start of a page is downloaded (Range request); enough for menus and file lists
+        self.max_page_bytes = max_page_bytes
+
+    @classmethod
+    def shared(cls) -> "LinkVerifier":
+        """Process-wide instance used when no verifier is injected"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(timeout=float(os.getenv("LINK_VERIFY_TIMEOUT", "8")))
+            return cls._shared
+
+    def verify(self, url: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Check a media-kit URL (cached per URL in the "verify" tool-cache namespace)
+
+        Args:
+            url: URL returned by the agent or stored in the registry
+            refresh: Ignore a cached verdict and check again (the new verdict is cached)
+
+        Returns:
+            {"url", "final_url", "http_status", "content_type", "redirects", "kind", "attachments",
+             "ad_score", "verdict", "checked_at"}; kind is "file", "page", "soft_404", "dead",
+            "blocked" (non-public host) or "unreachable"
+        """
+        cache_key = self.cache.make_key(normalize_url(url))
+        cached = None if refresh else self.cache.get("verify", cache_key)
+        if cached is not None:
+            logger.info(f"[VERIFY] Cached verdict for {url}: {cached['verdict']} ({cached['kind']})")
+            return cached
+
+        result = self._check(url)
+        result["checked_at"] = time.time()
+        logger.info(
+            f"[VERIFY] {url}: {result['verdict']} ({result['kind']}, HTTP {result['http_status']}, "
+            f"{len(result['attachments'])} attachments, {result['redirects']} redirects)"
+        )
+        inconclusive = result["kind"] == "unreachable"
+        self.cache.set("verify", cache_key, result, ttl=self.INCONCLUSIVE_TTL if inconclusive else None)
+        return result
+
+    def _check(self, url: str) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "url": url,
+            "final_url": url,
+            "http_status": None,
+            "content_type": "",
+            "redirects": 0,
+            "kind": "unreachable",
+            "attachments": [],
+            "ad_score": 0,
+            "verdict": self.UNCONFIRMED,
+        }
+        headers = {"User-Agent": USER_AGENT}
+        try:
+            # HEAD answers file URLs without downloading them; some servers refuse HEAD
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True, headers=headers)
+            if response.status_code not in (403, 405, 501) and response.status_code < 500:
+                self._record_response(result, response)
+                if self._is_document(response):
+                    return self._finish(result, "file")
+                if response.status_code in (404, 410):
+                    return self._finish(result, "dead")
+
+            # Ranged GET of the start of the page
+            with self.session.get(
+                url,
+                timeout=self.timeout,
+                allow_redirects=True,
+                stream=True,
+                headers={**headers, "Range": f"bytes=0-{self.max_page_bytes - 1}"},
+            ) as response:
+                self._record_response(result, response)
+                if response.status_code in (404, 410):
+                    return self._finish(result, "dead")
+                if response.status_code >= 400:
+                    return self._finish(result, "unreachable")
+                if self._is_document(response):
+                    return self._finish(result, "file")
+                body = response.raw.read(self.max_page_bytes, decode_content=True)
+                html = body.decode(self._encoding(response, body), errors="ignore")
+        except UnsafeURLError as e:
+            logger.warning(f"[VERIFY] Refusing {url}: {e}")
+            return self._finish(result, "blocked")
+        except Exception as e:
+            # requests errors, and urllib3 errors raised while reading the body (ProtocolError, DecodeError, ...)
+            logger.info(f"[VERIFY] Could not reach {url}: {type(e).__name__}: {e}")
+            return self._finish(result, "unreachable")
+
+        if self._is_soft_404(url, result["final_url"], html):
+            return self._finish(result, "soft_404")
+        result["attachments"] = self._attachment_links(html, result["final_url"])
+        result["ad_score"] = keyword_score(TAG_PATTERN.sub(" ", html))
+        return self._finish(result, "page")
+
+    def _finish(self, result: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        result["kind"] = kind
+        if kind in ("dead", "soft_404", "blocked"):
+            result["verdict"] = self.DEAD
+        elif kind == "file" or (kind == "page" and result["attachments"]):
+            result["verdict"] = self.VERIFIED
+        else:
+            result["verdict"] = self.UNCONFIRMED
+        return result
+
+    @staticmethod
+    def _record_response(result: Dict[str, Any], response: requests.Response) -> None:
+        result["http_status"] = response.status_code
+        result["final_url"] = response.url
+        result["redirects"] = len(response.history)
+        result["content_type"] = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+    @staticmethod
+    def _is_document(response: requests.Response) -> bool:
+        if response.status_code not in (200, 206):
+            return False
+        content_type = response.headers.get("Content-Type", "").lower()
+        disposition = response.headers.get("Content-Disposition", "").lower()
+        return (
+            any(kind in content_type for kind in DOCUMENT_CONTENT_TYPES)
+            or "attachment" in disposition
+            or (content_type.startswith("application/octet-stream") and is_document_url(response.url))
+        )
+
+    @staticmethod
+    def _encoding(response: requests.Response, body: bytes) -> str:
+        if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+            return response.encoding
+        # Many Korean sites declare EUC-KR only in a <meta> tag
+        match = META_CHARSET_PATTERN.search(body[:4096])
+        if match:
+            try:
+                return codecs.lookup(match.group(1).decode("ascii")).name
+            except LookupError:
+                pass
+        return "utf-8"
+
+    @staticmethod
+    def _is_soft_404(url: str, final_url: str, html: str) -> bool:
+        """Error pages served with 200, or a deep link redirected to the homepage"""
+        requested_path = urlsplit(url).path.strip("/")
+        final_path = urlsplit(final_url).path.strip("/")
+        # Only a real redirect away from the requested path counts (a site's own main.do is fine)
+        if requested_path and final_path != requested_path and final_path in ("", "index.html", "index.php", "main", "main.do"):
+            return True
+        title_match = TITLE_PATTERN.search(html)
+        title = title_match.group(1).casefold() if title_match else ""
+        if any(phrase in title for phrase in SOFT_404_PHRASES):
+            return True
+        text = re.sub(r"\s+", " ", TAG_PATTERN.sub(" ", html)).strip().casefold()
+        # Only short pages are judged by their body text
+        return len(text) < 1500 and any(phrase in text for phrase in SOFT_404_PHRASES)
+
+    @staticmethod
+    def _attachment_links(html: str, base_url: str, limit: int = 10) -> List[str]:
+        links = LINK_ATTRIBUTE_PATTERN.findall(html) + SCRIPT_LINK_PATTERN.findall(html)
+        attachments = []
+        for link in links:
+            link = link.strip()
+            # javascript: handlers are covered by SCRIPT_LINK_PATTERN
+            if link.lower().startswith(("javascript:", "mailto:", "tel:")):
+                continue
+            absolute = urljoin(base_url, link)
+            if is_attachment_link(absolute) and absolute not in attachments:
+                attachments.append(absolute)
+                if len(attachments) >= limit:
+                    break
+        return attachments
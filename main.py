@@ -1,39 +1,204 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, List, Literal, Optional, Tuple
+import asyncio
+import json
 import os
+import time
 import logging
 from dotenv import load_dotenv
 
-from media_kit_agent import MediaKitSearchAgent
+from agent_pool import AgentPool
+from jobs import JobQueueFullError, JobStore, JobWorkerPool
+from outlet_names import OutletNameIndex
+from outlet_registry import OutletRegistry
+from refresh_scheduler import OutletPopularity, RefreshScheduler
+from result_cache import ResultCache, classify_result, result_value
+from run_context import RunContext, SearchCancelledError
+from search_executor import SearchExecutor, SearchQueueFullError, SearchExecutorClosedError
+from single_flight import SingleFlight
+from tracing import Metrics, install_log_filter, new_request_id, record_run, request_id
 
-# Configure logging
+# Configure logging (force: imported modules may already have called basicConfig)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s',
+    force=True
 )
+install_log_filter()
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
+# Bounded thread pool for blocking agent runs (keeps the event loop responsive)
+search_executor = SearchExecutor.from_env()
+
+# Ready agents and keep-alive HTTP clients reused across requests
+agent_pool = AgentPool.from_env()
+
+# Result cache shared by all workers (in-process LRU + SQLite)
+result_cache = ResultCache.from_env()
+
+# One agent run per (normalized name, strict_mode) at a time, across all workers
+single_flight = SingleFlight.from_env()
+
+# Prometheus metrics, aggregated over all workers on /metrics
+metrics = Metrics.from_env()
+
+# Name variants ("중앙 일보", "JoongAng Ilbo", ...) -> one canonical outlet name
+name_index = OutletNameIndex.shared()
+
+# Requests per canonical outlet, ranking what the refresh scheduler keeps fresh
+outlet_popularity = OutletPopularity.from_env()
+
+# Default per-search budgets (0 = unlimited); a request may set its own
+SEARCH_BUDGET_DEFAULTS = {
+    "max_tool_calls": int(os.getenv("SEARCH_MAX_TOOL_CALLS", "40")),
+    "max_tokens": int(os.getenv("SEARCH_MAX_TOKENS", "1000000")),
+    "deadline_seconds": float(os.getenv("SEARCH_DEADLINE_SECONDS", "900")),
+}
+
+# Batch search limits
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_MAX_PARALLEL = int(os.getenv("BATCH_MAX_PARALLEL", "8"))
+
+# Run the refresh scheduler inside the API workers (it can also run as its own process)
+REFRESH_ENABLED = os.getenv("REFRESH_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+async def run_job(job: Dict) -> Dict[str, str]:
+    """Job handler: run a queued search, waiting while the executor is saturated"""
+    while True:
+        try:
+            result, _ = await run_search(**job)
+            return result
+        except SearchQueueFullError:
+            await asyncio.sleep(5)
+
+
+# Persistent job table + per-worker pool draining queued searches
+job_pool = JobWorkerPool(
+    JobStore.from_env(),
+    handler=run_job,
+    concurrency=int(os.getenv("JOB_WORKERS", "8")),
+    max_queue=int(os.getenv("JOB_MAX_QUEUE", "1000"))
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: start job workers, release background resources on shutdown"""
+    # Registry aliases define the canonical names; cache keys are normalized (lowercased) names and
+    # would turn "KBS" into "kbs", so other outlets are learned from requests instead
+    logger.info(f"[API] Outlet name index loaded with {name_index.load(OutletRegistry.shared().aliases())} names")
+    job_pool.start()
+    # Off-peak re-resolution of the most requested outlets; one cycle at a time across workers
+    refresh_scheduler = RefreshScheduler.from_env(run_search, outlet_popularity, result_cache, metrics) if REFRESH_ENABLED else None
+    if refresh_scheduler is not None:
+        refresh_scheduler.start()
+    yield
+    if refresh_scheduler is not None:
+        await refresh_scheduler.stop()
+    await job_pool.stop()
+    search_executor.shutdown(wait=False)
+    agent_pool.close()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Media Kit Search API",
     description="API for searching media kits and advertising materials from Korean media outlets",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Propagate X-Request-ID (or a generated id) to logs and the response"""
+    rid = new_request_id(request.headers.get("X-Request-ID"))
+    token = request_id.set(rid)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id.reset(token)
+    response.headers["X-Request-ID"] = rid
+    return response
+
+
 # Request model
 class MediaSearchRequest(BaseModel):
     media_name: str
     openai_api_key: str
     firecrawl_api_key: str
     strict_mode: bool = True  # Default to strict mode for backward compatibility
+    cache: Literal["use", "bypass", "refresh"] = "use"
+    max_tool_calls: Optional[int] = None  # Budgets default to SEARCH_* settings
+    max_tokens: Optional[int] = None
+    deadline_seconds: Optional[float] = None
+    cascade: bool = False  # strict_mode only: fall back to a flexible search seeded with the strict evidence
+    speed: Literal["quality", "fast"] = "quality"  # fast: EXPLORATION_MODEL explores, DECISION_MODEL decides
 
 # Response model
 class MediaSearchResponse(BaseModel):
     result: Dict[str, str]
+    budget_exhausted: Optional[str] = None  # "tool_calls", "tokens" or "deadline"
+    answered_by: Optional[Literal["strict", "flexible"]] = None  # Set for cascade requests
+    speed: str = "quality"
+    canonical_name: Optional[str] = None  # Outlet the name resolved to (cache and agent run under it)
+
+# Batch request models
+class BatchSearchItem(BaseModel):
+    media_name: str
+    strict_mode: bool = True
+
+class BatchSearchRequest(BaseModel):
+    items: List[BatchSearchItem]
+    openai_api_key: str
+    firecrawl_api_key: str
+    cache: Literal["use", "bypass", "refresh"] = "use"
+    speed: Literal["quality", "fast"] = "quality"
+    max_parallel: Optional[int] = None  # Capped by BATCH_MAX_PARALLEL
+    max_tool_calls: Optional[int] = None  # Per-item budgets
+    max_tokens: Optional[int] = None
+    deadline_seconds: Optional[float] = None
+
+# Batch response models
+class BatchItemResult(BaseModel):
+    media_name: str
+    strict_mode: bool
+    status: Literal["ok", "rejected", "error"]
+    result: Dict[str, str]
+    cache: str
+    elapsed_ms: float
+    budget_exhausted: Optional[str] = None
+    canonical_name: Optional[str] = None
+
+class BatchSearchResponse(BaseModel):
+    items: List[BatchItemResult]
+    unique_searches: int
+    elapsed_ms: float
+    speed: str
+
+# Job response models
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    media_name: str
+    strict_mode: bool
+    status: Literal["queued", "running", "succeeded", "failed"]
+    result: Optional[Dict[str, str]] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
 
 
 @app.get("/")
@@ -43,25 +208,210 @@ async def root():
         "message": "Media Kit Search API",
         "description": "Search for media kits and advertising materials from Korean media outlets",
         "endpoints": {
-            "POST /search": "Search for media kit URL by media name"
+            "POST /search": "Search for media kit URL by media name",
+            "POST /search/stream": "Search for media kit URL, streaming agent progress as Server-Sent Events",
+            "POST /search/batch": "Search media kit URLs for a list of media names",
+            "POST /jobs": "Queue a media kit search and return a job id immediately",
+            "GET /jobs/{job_id}": "Get status and result of a queued search",
+            "GET /metrics": "Prometheus metrics (search, model turn and tool call latency)"
         },
         "options": {
+            "cache": {
+                "description": "Result cache behaviour",
+                "default": "use",
+                "use": "Return a cached result when available, otherwise search and store",
+                "bypass": "Ignore the cache completely (no read, no write)",
+                "refresh": "Always search and overwrite the cached result"
+            },
             "strict_mode": {
                 "description": "Search mode setting",
                 "default": True,
                 "true": "Only search official media company websites (strict mode)",
                 "false": "Allow search engines and intermediate hubs (flexible mode)"
+            },
+            "cascade": {
+                "description": "With strict_mode=true, run a flexible search seeded with the strict search's evidence when strict finds nothing",
+                "default": False
+            },
+            "speed": {
+                "description": "Model tier",
+                "default": "quality",
+                "quality": "The decision model (o3) drives every turn",
+                "fast": "A cheaper exploration model gathers candidates, the decision model only adjudicates"
             }
         }
     }
 
+def validate_cascade(request: MediaSearchRequest) -> None:
+    """Reject cascade requests that do not start in strict mode"""
+    if request.cascade and not request.strict_mode:
+        raise HTTPException(status_code=400, detail="cascade requires strict_mode=true")
+
+def search_budget(request: BaseModel) -> Dict[str, Optional[float]]:
+    """
+    RunContext budget arguments for a request
+
+    Args:
+        request: Request model with max_tool_calls, max_tokens and deadline_seconds
+
+    Returns:
+        Request values, falling back to SEARCH_BUDGET_DEFAULTS (None = unlimited)
+    """
+    budget = {}
+    for name, default in SEARCH_BUDGET_DEFAULTS.items():
+        value = getattr(request, name)
+        if value is not None and value <= 0:
+            raise HTTPException(status_code=400, detail=f"{name} must be positive")
+        value = value if value is not None else default
+        budget[name] = value if value > 0 else None
+    return budget
+
+async def run_search(
+    media_name: str,
+    openai_api_key: str,
+    firecrawl_api_key: str,
+    strict_mode: bool,
+    cache_mode: str = "use",
+    run: Optional[RunContext] = None,
+    budget: Optional[Dict[str, Optional[float]]] = None,
+    cascade: bool = False,
+    speed: str = "quality",
+    count_request: bool = True,
+    use_registry: bool = True,
+) -> Tuple[Dict[str, str], str]:
+    """
+    Resolve a media kit URL through the result cache and the agent executor
+
+    Args:
+        media_name: Stripped media name
+        openai_api_key: OpenAI API key for the agent
+        firecrawl_api_key: Firecrawl API key for the agent tools
+        strict_mode: Search mode
+        cache_mode: "use", "bypass" or "refresh"
+        run: Optional RunContext receiving progress events (and used for cancellation and budgets)
+        budget: Budget arguments for the RunContext created when run is not given
+        cascade: With strict_mode, follow a "not found" with a flexible search seeded with
+            the strict run's evidence (run.cascaded tells which phase answered)
+        speed: Model tier, "quality" or "fast"
+        count_request: Count the search towards the outlet's popularity (off for refresh_scheduler runs)
+        use_registry: Let the outlet registry answer before the agent runs (off for refresh_scheduler
+            runs, which must detect a moved media kit)
+
+    Returns:
+        (result dict keyed by media_name, cache status) where cache status is HIT, MISS,
+        COALESCED, BYPASS or REFRESH (of the flexible phase once a cascade falls through)
+
+    Note:
+        With cache_mode="use", concurrent identical searches (same normalized name and
+        strict_mode) share one agent run, also across gunicorn workers.
+        Both cascade phases share the run's budgets and are cached under their own mode.
+        Results are cached per mode only, so both speed tiers share them.
+        Name variants resolve to one canonical outlet name (run.canonical_name) before any
+        cache, registry or agent lookup, so they share results and coalesce.
+    """
+    # Every search gets a RunContext so its spans end up in the trace and metrics
+    run = run or RunContext(**(budget or {}))
+    cache_status, status = "NONE", "failed"
+    match = name_index.resolve(media_name)
+    run.canonical_name = match.canonical
+    if count_request:
+        await asyncio.to_thread(outlet_popularity.record, match.canonical, strict_mode)
+    if match.canonical != media_name:
+        logger.info(f"[API] '{media_name}' resolved to '{match.canonical}' ({match.method}, {match.score:.2f})")
+    try:
+        result, cache_status = await _resolve(
+            match.canonical, openai_api_key, firecrawl_api_key, strict_mode, cache_mode, run, speed, use_registry=use_registry
+        )
+        status = classify_result(result_value(result))
+        if cascade and strict_mode and status == "not_found" and run.budget_hit is None:
+            logger.info(f"[API] Strict search found nothing, cascading to flexible for: {media_name} ({cache_status})")
+            run.cascaded = True
+            run.emit("cascade", phase="flexible", strict_cache=cache_status, searches=len(run.searches), pages=len(run.pages))
+            result, cache_status = await _resolve(
+                match.canonical, openai_api_key, firecrawl_api_key, False, cache_mode, run, speed, seed_evidence=True
+            )
+            status = classify_result(result_value(result))
+        # Re-key on the name the caller asked for
+        return {media_name: result_value(result)}, cache_status
+    except (SearchCancelledError, asyncio.CancelledError):
+        status = "cancelled"
+        raise
+    except (SearchQueueFullError, SearchExecutorClosedError):
+        status = "rejected"
+        raise
+    finally:
+        # Publishing the metrics snapshot writes to SQLite
+        await asyncio.to_thread(record_run, metrics, run, media_name, strict_mode, cache_status, status, speed)
+
+
+async def _resolve(
+    media_name: str,
+    openai_api_key: str,
+    firecrawl_api_key: str,
+    strict_mode: bool,
+    cache_mode: str,
+    run: RunContext,
+    speed: str = "quality",
+    seed_evidence: bool = False,
+    use_registry: bool = True,
+) -> Tuple[Dict[str, str], str]:
+    """Cache lookup, single-flight coalescing and the agent run behind run_search"""
+    # SQLite calls (busy timeout up to 30s) run off the event loop
+    if cache_mode == "use":
+        cached = await asyncio.to_thread(result_cache.get, media_name, strict_mode)
+        if cached is not None:
+            value, stored_at = cached
+            logger.info(f"[API] Cache hit for: {media_name} (age {time.time() - stored_at:.0f}s)")
+            run.emit("cache", status="HIT")
+            return {media_name: value}, "HIT"
+
+    async def search() -> Dict[str, str]:
+        # Search for media kit on the executor so the event loop keeps serving other requests.
+        # The pooled agent is checked out and returned inside the worker thread.
+        result = await search_executor.run(
+            agent_pool.run,
+            openai_api_key,
+            firecrawl_api_key,
+            strict_mode,
+            lambda agent: agent.search_media_kit(
+                media_name, run, use_registry=use_registry and cache_mode != "refresh" and not seed_evidence, seed_evidence=seed_evidence
+            ),
+            speed=speed
+        )
+        # A "not found" cut short by a budget may be found with a bigger one: do not pin it
+        cut_short = run.budget_hit is not None and classify_result(result_value(result)) != "found"
+        if cache_mode != "bypass" and not cut_short:
+            await asyncio.to_thread(result_cache.set, media_name, strict_mode, result_value(result))
+        return result
+
+    if cache_mode != "use":
+        # bypass / refresh explicitly ask for a run of their own
+        return await search(), {"bypass": "BYPASS", "refresh": "REFRESH"}[cache_mode]
+
+    def published() -> Optional[Dict[str, str]]:
+        # A leader in another worker publishes its result through the result cache
+        # (single_flight calls it off the event loop)
+        cached = result_cache.get(media_name, strict_mode)
+        return {media_name: cached[0]} if cached is not None else None
+
+    result, role = await single_flight.do(ResultCache.key(media_name, strict_mode), search, published)
+    if role == "leader":
+        return result, "MISS"
+
+    logger.info(f"[API] Coalesced search for: {media_name} ({role})")
+    run.emit("cache", status="COALESCED")
+    # Re-key on the name this caller asked for
+    return {media_name: result_value(result)}, "COALESCED"
+
+
 @app.post("/search", response_model=MediaSearchResponse)
-async def search_media_kit(request: MediaSearchRequest):
+async def search_media_kit(request: MediaSearchRequest, response: Response):
     """
     Search for media kit URL for the given Korean media outlet
     
     Args:
-        request: MediaSearchRequest with media_name and strict_mode fields
+        request: MediaSearchRequest with media_name, strict_mode and cache fields
+        response: Outgoing response (used to set the X-Cache header)
         
     Returns:
         MediaSearchResponse with the search result
@@ -69,37 +419,292 @@ async def search_media_kit(request: MediaSearchRequest):
     Note:
         strict_mode=True: Only official media company websites (default)
         strict_mode=False: Allows search engines and intermediate hubs
+        cascade=True: A strict "not found" continues as a flexible search seeded with the
+        strict evidence; answered_by tells which phase produced the result
+        budget_exhausted names the budget that cut the search short, if any
+        The X-Cache response header is HIT, MISS, COALESCED, BYPASS or REFRESH
     """
     try:
         # Validate input
         if not request.media_name or not request.media_name.strip():
             raise HTTPException(status_code=400, detail="Media name cannot be empty")
+        validate_cascade(request)
         
         mode_text = "STRICT" if request.strict_mode else "FLEXIBLE"
-        logger.info(f"[API] Received search request for: {request.media_name} (Mode: {mode_text})")
+        logger.info(f"[API] Received search request for: {request.media_name} (Mode: {mode_text}, Cache: {request.cache}, Speed: {request.speed})")
         
-        # Create a new agent instance for each request (independent context)
-        agent = MediaKitSearchAgent(
+        run = RunContext(**search_budget(request))
+        result, cache_status = await run_search(
+            request.media_name.strip(),
             openai_api_key=request.openai_api_key,
             firecrawl_api_key=request.firecrawl_api_key,
-            strict_mode=request.strict_mode
+            strict_mode=request.strict_mode,
+            cache_mode=request.cache,
+            run=run,
+            cascade=request.cascade,
+            speed=request.speed
         )
+        response.headers["X-Cache"] = cache_status
+        answered_by = ("flexible" if run.cascaded else "strict") if request.cascade else None
         
-        # Search for media kit
-        result = agent.search_media_kit(request.media_name.strip())
-        
-        logger.info(f"[API] Returning result: {result}")
-        return MediaSearchResponse(result=result)
+        logger.info(f"[API] Returning result: {result} (Cache: {cache_status}, Budget exhausted: {run.budget_hit}, Answered by: {answered_by})")
+        return MediaSearchResponse(
+            result=result,
+            budget_exhausted=run.budget_hit,
+            answered_by=answered_by,
+            speed=request.speed,
+            canonical_name=run.canonical_name
+        )
         
+    except HTTPException:
+        raise
+    except SearchQueueFullError as e:
+        logger.warning(f"[API] Rejecting search, executor is full: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except SearchExecutorClosedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
     except Exception as e:
         logger.error(f"[API ERROR] {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+def sse_event(event_type: str, data: Dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/search/stream")
+async def search_media_kit_stream(request: MediaSearchRequest, http_request: Request):
+    """
+    Search for media kit URL and stream progress as Server-Sent Events
+    
+    Args:
+        request: MediaSearchRequest (same fields as /search)
+        http_request: Incoming request (used to detect client disconnects)
+        
+    Returns:
+        text/event-stream with model_turn, tool_call, candidates, cache and budget events,
+        followed by a final result event ({media: url}) or an error event
+        
+    Note:
+        Closing the connection cancels the agent run at its next model turn or tool call.
+    """
+    if not request.media_name or not request.media_name.strip():
+        raise HTTPException(status_code=400, detail="Media name cannot be empty")
+    validate_cascade(request)
+
+    media_name = request.media_name.strip()
+    loop = asyncio.get_running_loop()
+    events: "asyncio.Queue[Dict]" = asyncio.Queue()
+    # Events are emitted from the executor thread, hand them over to the event loop
+    run = RunContext(
+        on_event=lambda event: loop.call_soon_threadsafe(events.put_nowait, event),
+        **search_budget(request)
+    )
+
+    async def stream():
+        task = asyncio.create_task(run_search(
+            media_name,
+            openai_api_key=request.openai_api_key,
+            firecrawl_api_key=request.firecrawl_api_key,
+            strict_mode=request.strict_mode,
+            cache_mode=request.cache,
+            run=run,
+            cascade=request.cascade,
+            speed=request.speed
+        ))
+        try:
+            yield sse_event("start", {"media_name": media_name, "strict_mode": request.strict_mode, "speed": request.speed})
+            while not (task.done() and events.empty()):
+                if await http_request.is_disconnected():
+                    logger.info(f"[API] Client disconnected, cancelling search for: {media_name}")
+                    return
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_event(event.pop("type"), event)
+
+            try:
+                result, cache_status = task.result()
+                answered_by = ("flexible" if run.cascaded else "strict") if request.cascade else None
+                yield sse_event("result", {
+                    "result": result,
+                    "cache": cache_status,
+                    "budget_exhausted": run.budget_hit,
+                    "answered_by": answered_by,
+                    "speed": request.speed,
+                    "canonical_name": run.canonical_name
+                })
+            except SearchQueueFullError as e:
+                yield sse_event("error", {"status_code": 429, "detail": str(e)})
+            except SearchExecutorClosedError as e:
+                # Same codes as /search: 429 = over capacity, 503 = shutting down
+                yield sse_event("error", {"status_code": 503, "detail": str(e)})
+            except SearchCancelledError as e:
+                yield sse_event("error", {"status_code": 499, "detail": str(e)})
+            except Exception as e:
+                logger.error(f"[API ERROR] {str(e)}")
+                yield sse_event("error", {"status_code": 500, "detail": f"Internal server error: {str(e)}"})
+        finally:
+            if not task.done():
+                run.cancel()
+                task.cancel()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/search/batch", response_model=BatchSearchResponse)
+async def search_media_kit_batch(request: BatchSearchRequest):
+    """
+    Search media kit URLs for many media outlets in one request
+    
+    Args:
+        request: BatchSearchRequest with items (media_name, strict_mode) and shared options
+        
+    Returns:
+        BatchSearchResponse with one entry per input item, in input order
+        
+    Note:
+        Items whose normalized name and strict_mode match are searched once.
+        At most max_parallel (<= BATCH_MAX_PARALLEL) searches run at the same time.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Items cannot be empty")
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many items (max {BATCH_MAX_ITEMS})")
+    if any(not item.media_name or not item.media_name.strip() for item in request.items):
+        raise HTTPException(status_code=400, detail="Media name cannot be empty")
+
+    budget = search_budget(request)
+    batch_started = time.perf_counter()
+    max_parallel = min(request.max_parallel or BATCH_MAX_PARALLEL, BATCH_MAX_PARALLEL)
+    semaphore = asyncio.Semaphore(max(max_parallel, 1))
+
+    # Deduplicate on the same key the result cache uses (name variants share one search)
+    def item_key(item: BatchSearchItem) -> str:
+        return ResultCache.key(name_index.resolve(item.media_name.strip()).canonical, item.strict_mode)
+
+    # Resolved once per item: the name index may learn names while the searches run
+    keys = [item_key(item) for item in request.items]
+    unique: Dict[str, BatchSearchItem] = {}
+    for key, item in zip(keys, request.items):
+        unique.setdefault(key, item)
+    logger.info(f"[API] Received batch of {len(request.items)} items ({len(unique)} unique, parallel={max_parallel})")
+
+    async def run_item(item: BatchSearchItem) -> Tuple[str, Dict[str, str], str, float, RunContext]:
+        media_name = item.media_name.strip()
+        async with semaphore:
+            started = time.perf_counter()
+            # The deadline of each item starts when it gets a slot
+            run = RunContext(**budget)
+            try:
+                result, cache_status = await run_search(
+                    media_name,
+                    openai_api_key=request.openai_api_key,
+                    firecrawl_api_key=request.firecrawl_api_key,
+                    strict_mode=item.strict_mode,
+                    cache_mode=request.cache,
+                    run=run,
+                    speed=request.speed
+                )
+                # An agent answer of "에러: ..." is an error like any other (as in /search metrics)
+                status = "error" if classify_result(result_value(result)) == "error" else "ok"
+            except (SearchQueueFullError, SearchExecutorClosedError) as e:
+                result, cache_status, status = {media_name: f"에러: {e}"}, "NONE", "rejected"
+            except Exception as e:
+                logger.error(f"[API ERROR] Batch item {media_name}: {str(e)}")
+                result, cache_status, status = {media_name: f"에러: {e}"}, "NONE", "error"
+            return status, result, cache_status, (time.perf_counter() - started) * 1000, run
+
+    outcomes = await asyncio.gather(*(run_item(item) for item in unique.values()))
+    by_key = dict(zip(unique.keys(), outcomes))
+
+    items = []
+    for key, item in zip(keys, request.items):
+        status, result, cache_status, elapsed_ms, run = by_key[key]
+        items.append(BatchItemResult(
+            media_name=item.media_name.strip(),
+            strict_mode=item.strict_mode,
+            status=status,
+            # Re-key on the name this item was requested with
+            result={item.media_name.strip(): result_value(result)},
+            cache=cache_status,
+            elapsed_ms=round(elapsed_ms, 1),
+            budget_exhausted=run.budget_hit,
+            canonical_name=run.canonical_name
+        ))
+
+    return BatchSearchResponse(
+        items=items,
+        unique_searches=len(unique),
+        elapsed_ms=round((time.perf_counter() - batch_started) * 1000, 1),
+        speed=request.speed
+    )
+
+@app.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(request: MediaSearchRequest):
+    """
+    Queue a media kit search and return immediately
+    
+    Args:
+        request: MediaSearchRequest (same fields as /search)
+        
+    Returns:
+        JobSubmitResponse with the job id; poll GET /jobs/{job_id} for the result
+    """
+    if not request.media_name or not request.media_name.strip():
+        raise HTTPException(status_code=400, detail="Media name cannot be empty")
+    validate_cascade(request)
+
+    media_name = request.media_name.strip()
+    try:
+        job_id = await job_pool.submit(media_name, request.strict_mode, {
+            "media_name": media_name,
+            "openai_api_key": request.openai_api_key,
+            "firecrawl_api_key": request.firecrawl_api_key,
+            "strict_mode": request.strict_mode,
+            "cache_mode": request.cache,
+            "budget": search_budget(request),
+            "cascade": request.cascade,
+            "speed": request.speed
+        })
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "60"})
+
+    logger.info(f"[API] Queued job {job_id} for: {media_name}")
+    return JobSubmitResponse(job_id=job_id, status="queued", status_url=f"/jobs/{job_id}")
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """
+    Get the status of a queued search
+    
+    Args:
+        job_id: Id returned by POST /jobs
+        
+    Returns:
+        JobStatusResponse; result is set once status is "succeeded"
+    """
+    job = await asyncio.to_thread(job_pool.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job["job_id"] = job.pop("id")
+    return JobStatusResponse(**job)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text format metrics summed over all live workers"""
+    return PlainTextResponse(await asyncio.to_thread(metrics.render), media_type="text/plain; version=0.0.4")
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return {"status": "healthy", "search_executor": search_executor.stats(), "jobs": job_pool.stats(), "agent_pool": agent_pool.stats()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,33 +1,151 @@
 from textwrap import dedent
 from typing import Dict, Optional
 import json
+import os
 import re
+import time
 import logging
 
+import httpx
+import openai
+import requests
+
 from agno.agent import Agent
+from agno.exceptions import ModelProviderError
+from agno.models.message import Message
 from agno.models.openai import OpenAIChat
 from firecrawl_tool import FirecrawlTools
+from link_verifier import LinkVerifier
+from outlet_registry import OutletRegistry
+from rate_limiter import RateLimitedTransport, RateLimiter
+from result_cache import NOT_FOUND
+from run_context import RunContext, SearchBudgetExceededError, SearchCancelledError, current_run
+from url_guard import same_site
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+BUDGET_EXHAUSTED_NOTE = (
+    "검색 예산이 모두 소진되었습니다. 더 이상 도구를 호출하지 말고, 지금까지 실제로 확인한 후보 중 가장 신뢰할 수 있는 URL을 "
+    "출력하세요. 확인된 후보가 없다면 '찾을 수 없음'으로 결정하세요. 출력 형식은 {\"매체명\": \"[url 또는 찾을 수 없음]\"} 단일 JSON입니다."
+)
+
+DECISION_NOTE = (
+    "탐색 단계가 끝났습니다. 위 대화의 검색·열람 결과를 근거로 후보 URL들을 검토하여, 지침의 기준(허용 경로, 실제 파일/소개서 존재, "
+    "신뢰성·최근성)에 맞는 최종 URL 하나를 결정하세요. 탐색 단계의 잠정 결론은 참고만 하고, 근거가 부족하면 다른 후보로 바꾸거나 "
+    "'찾을 수 없음'으로 결정하세요. 출력 형식은 {\"매체명\": \"[url 또는 찾을 수 없음]\"} 단일 JSON입니다."
+)
+
+# Speed tiers: "quality" runs every turn on the decision model; "fast" explores with a
+# cheaper model and calls the decision model once to adjudicate the shortlist
+SPEED_TIERS = ("quality", "fast")
+EXPLORATION_MODEL = os.getenv("EXPLORATION_MODEL", "gpt-4.1-mini")
+DECISION_MODEL = os.getenv("DECISION_MODEL", "o3")
+
+# Size limits of the strict-phase evidence handed to a cascaded flexible search
+EVIDENCE_MAX_SEARCHES = 15
+EVIDENCE_MAX_PAGES = 25
+EVIDENCE_URLS_PER_SEARCH = 5
+
+
+class ObservedOpenAIChat(OpenAIChat):
+    """OpenAIChat that reports each model turn to the active RunContext and honours cancellation"""
+
+    # Reasoning model that takes the final decision when this model only explores (fast tier)
+    decision_model: Optional[OpenAIChat] = None
+
+    def invoke(self, messages, **kwargs):
+        run = current_run.get()
+        if run is None:
+            return super().invoke(messages, **kwargs)
+
+        final_turn = run.start_model_turn()
+        if final_turn:
+            # Budget exhausted: one last turn without tools to answer with what was found
+            messages = [*messages, Message(role="user", content=BUDGET_EXHAUSTED_NOTE)]
+            kwargs["tool_choice"] = "none"
+            if self.decision_model is not None:
+                return self._observed_invoke(run, self.decision_model, messages, kwargs)
+
+        response = self._observed_invoke(run, None, messages, kwargs)
+        message = response.choices[0].message if response.choices else None
+        if self.decision_model is None or message is None or message.tool_calls:
+            return response
+
+        # Exploration is over: the decision model adjudicates the gathered evidence, without tools
+        run.check_cancelled()
+        logger.info(f"[AGENT] Exploration finished with {self.id}, adjudicating with {self.decision_model.id}")
+        proposal = [Message(role="assistant", content=message.content)] if message.content else []
+        messages = [*messages, *proposal, Message(role="user", content=DECISION_NOTE)]
+        return self._observed_invoke(run, self.decision_model, messages, {**kwargs, "tool_choice": "none"})
+
+    def _observed_invoke(self, run: RunContext, model: Optional[OpenAIChat], messages, kwargs):
+        """Invoke this model (model=None) or the decision model and report the turn to the run"""
+        started = time.perf_counter()
+        response = super().invoke(messages, **kwargs) if model is None else model.invoke(messages, **kwargs)
+        run.model_turns += 1
+
+        usage = getattr(response, "usage", None)
+        run.tokens += (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+        message = response.choices[0].message if response.choices else None
+        tool_calls = [call.function.name for call in (message.tool_calls or [])] if message else []
+        run.emit(
+            "model_turn",
+            turn=run.model_turns,
+            model=(model or self).id,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            input_tokens=getattr(usage, "prompt_tokens", None),
+            output_tokens=getattr(usage, "completion_tokens", None),
+            tool_calls=tool_calls,
+        )
+        return response
+
+
 class MediaKitSearchAgent:
     """Agent for searching media kits and advertising materials from Korean media outlets"""
     
-    def __init__(self, openai_api_key: str, firecrawl_api_key: str, strict_mode: bool = True):
+    def __init__(
+        self,
+        openai_api_key: str,
+        firecrawl_api_key: str,
+        strict_mode: bool = True,
+        registry: Optional[OutletRegistry] = None,
+        http_client: Optional[httpx.Client] = None,
+        firecrawl_session: Optional[requests.Session] = None,
+        verifier: Optional[LinkVerifier] = None,
+        speed: str = "quality",
+    ):
         self.openai_api_key = openai_api_key
-        self.firecrawl_tools = FirecrawlTools(api_key=firecrawl_api_key)
+        self.firecrawl_api_key = firecrawl_api_key
+        self.firecrawl_tools = FirecrawlTools(api_key=firecrawl_api_key, session=firecrawl_session)
         self.strict_mode = strict_mode
+        self.speed = speed
+        # Known outlets are answered without calling the model
+        self.registry = registry or OutletRegistry.shared()
+        # The final answer is checked with plain HTTP instead of another model / Firecrawl round
+        self.verifier = verifier or self.registry.verifier
         
         # Get instructions based on strict mode
         instructions = self._get_instructions(strict_mode)
         
-        # Create the agent with OpenAI o3 model
+        # Rate limits and retries are handled per API key by the transport, not by the SDK
+        http_client = http_client or httpx.Client(
+            transport=RateLimitedTransport(RateLimiter.shared("openai")),
+            timeout=httpx.Timeout(600, connect=10),
+        )
+        model_args = {"api_key": openai_api_key, "http_client": http_client, "max_retries": 0}
+
+        # Create the agent: the decision model (o3) drives every turn, or only adjudicates in the fast tier
+        if speed == "fast":
+            model = ObservedOpenAIChat(id=EXPLORATION_MODEL, **model_args)
+            model.decision_model = OpenAIChat(id=DECISION_MODEL, **model_args)
+        else:
+            model = ObservedOpenAIChat(id=DECISION_MODEL, **model_args)
         self.agent = Agent(
             name="Media Kit Search Agent",
-            model=OpenAIChat(id="o3", api_key=openai_api_key),
+            model=model,
             instructions=instructions,
             tools=[self.firecrawl_tools],
             markdown=False,
@@ -35,6 +153,10 @@ class MediaKitSearchAgent:
             debug_mode=True,
         )
     
+    def reset(self) -> None:
+        """Start a fresh agno session so the next run shares no conversation state with the last"""
+        self.agent.new_session()
+    
     def _get_instructions(self, strict_mode: bool) -> str:
         """Get instructions based on strict mode setting"""
         
@@ -51,19 +173,20 @@ class MediaKitSearchAgent:
         - 오로지 공식, 신뢰 가능한 경로(매체사 공식 홈페이지, 공식 문서 센터, 공식 광고 안내 등)만 허용합니다. 링크가 변조되었거나 공식 경로가 아닐 경우 해당 링크를 반드시 배제합니다.
         - 사용자의 조회 의도 및 입력 매체 이름이 모호하거나 혼동될 여지는 없는지 우선 체크하고, 내부적으로 가능한 모든 후보를 조사하여 해당 공식 페이지에서 직접 확인 가능한 자료가 있는지 엄밀히 검토합니다.
         - 각 매체의 홈페이지 사이트맵 또는 핵심 메뉴(광고/제휴/미디어킷/자료실 등)를 실제로 확인하여, 다운로드 또는 열람 가능한 주요 광고상품 안내, 미디어킷, 보도자료 URL을 수집합니다.
-        - 반드시 링크를 수집한 후, 해당 URL상에서 실제로 광고/상품 소개서 등 파일(다운로드 가능하거나 별도 파일 링크)이 직접 첨부되거나 확인 가능한지 마지막에 반드시 검증하세요. 실제 파일 또는 소개서가 존재하지 않거나 단순 안내 페이지만 있을 시에는 '찾을 수 없음'으로 간주합니다.
+        - 반드시 링크를 수집한 후, 이미 열람한 내용을 근거로 해당 URL상에서 실제로 광고/상품 소개서 등 파일(다운로드 가능하거나 별도 파일 링크)이 직접 첨부되거나 확인 가능한지 판단하세요. 실제 파일 또는 소개서가 존재하지 않거나 단순 안내 페이지만 있을 시에는 '찾을 수 없음'으로 간주합니다.
+        - 최종 URL의 접속 가능 여부(HTTP 상태, 404/오류 페이지), 파일 형식, 첨부 파일 링크는 답변 후 서버가 자동으로 검증합니다. 이 확인만을 위해 이미 열람한 페이지를 다시 scrape하지 마세요.
         - 어떤 매체도 공식 광고/상품 소개서 URL이 없다면, "찾을 수 없음"으로 명확하게 출력합니다.
         - 검색엔진(구글, 네이버, 다음)의 검색결과 리스트(검색페이지) 링크는 금지합니다. 반드시 직접적으로 파일 혹은 공식 문서가 포함된 매체사 페이지 링크만을 허용합니다.
         - 입력이 추상적이거나 특정 매체 식별이 어려워도, 매체사 공식 홈페이지 및 관련 페이지를 최선을 다해 추가 조사하며, 불충분할 시에는 "찾을 수 없음"을 표기합니다.
         - 여러 후보 자료 중에는 가장 신뢰성 높고 최근의 자료를 선택합니다.
         - 가능하면 PDF 파일(.pdf) URL 대신, 해당 PDF가 링크되거나 다운로드 가능한 공식 웹페이지 URL을 반환하세요. 단, 별도 웹페이지 없이 PDF 파일만 공식적으로 제공되는 경우에 한해 PDF URL을 반환합니다.
         - 반드시 사이트맵 및 실제 컨텐츠를 확인한 후, 매체 이름과 결과 URL 간의 매핑을 JSON 단일 객체(예: {"매체명": "[url 또는 찾을 수 없음]"})로 출력하세요.
-        - 내부적으로 절차적/추론적 과정을 충분히 수행한 이후(매체 공식 홈페이지 확인 → 사이트맵/핵심 메뉴 탐색 → 후보 URL 수집 → 최종적으로 실제 파일/소개서 실존 여부 검증 → 신뢰성·최근성 기준 선정) 반드시 마지막으로 파일 실존 여부까지 확인한 후에만 최종 JSON을 단일 결과로 제공하세요.
+        - 내부적으로 절차적/추론적 과정을 충분히 수행한 이후(매체 공식 홈페이지 확인 → 사이트맵/핵심 메뉴 탐색 → 후보 URL 수집 → 열람한 내용으로 실제 파일/소개서 실존 여부 판단 → 신뢰성·최근성 기준 선정) 이후에만 최종 JSON을 단일 결과로 제공하세요.
         - 결과 도출 전 반드시 다음 논리적 추론과정을 내부적으로 수행:
             1. 매체명으로 공식 홈페이지 식별 및 방문
             2. 사이트맵·메뉴·공지·문서센터 등 직접 열람
             3. 파일/안내서가 공식적으로 제공되는지 후보 URL 일차 판단
-            4. 해당 페이지에서 실제로 파일(소개서 등)이 첨부/다운로드/링크가 존재하는지 마지막에 재확인
+            4. 열람한 페이지 내용에서 실제로 파일(소개서 등)이 첨부/다운로드/링크가 존재하는지 확인 (재열람 불필요, 링크 상태는 서버가 자동 검증)
             5. 신뢰성, 최근성, 권위 기준 최종 선정
             6. 없다면 '찾을 수 없음'으로 결정
 
@@ -74,6 +197,11 @@ class MediaKitSearchAgent:
           * 예: "중앙일보 미디어킷", "중앙일보 광고안내", "중앙일보 광고상품"
           * 영문 매체의 경우: "media kit", "advertising", "advertise" 등도 포함
         - 여러 검색어로 시도해보고, 가장 관련성 높은 결과를 선택하세요
+        - 공식 홈페이지의 사이트맵은 sitemap 도구(공식 도메인 입력)로 확인하세요:
+          * robots.txt와 sitemap.xml(사이트맵 인덱스 포함)을 직접 분석하여 광고/미디어킷 관련 URL만 점수순으로 반환합니다
+          * 사이트맵 페이지를 scrape로 하나씩 열람하지 말고, sitemap 결과의 상위 URL을 우선 검증하세요
+        - 후보 URL이 여러 개이면 scrape를 하나씩 호출하지 말고 scrape_many 도구로 한 번에(최대 10개) 열람하세요:
+          * URL별 결과가 입력 순서대로 반환되며, 실패하거나 시간 초과된 URL은 error로 표시됩니다
 
         # Output Format
 
@@ -93,14 +221,14 @@ class MediaKitSearchAgent:
 
         # Notes
 
-        - 반드시 공식 홈페이지 내 사이트맵 또는 실제 웹 페이지 컨텐츠를 직접 열람하여 광고/상품 소개서, 미디어킷 등의 자료 확인 및 URL 도출, 마지막에 해당 URL에서 실제 파일(소개서 등)이 첨부·다운로드·링크로 존재하는지 확인하세요.
+        - 반드시 공식 홈페이지 내 사이트맵 또는 실제 웹 페이지 컨텐츠를 직접 열람하여 광고/상품 소개서, 미디어킷 등의 자료 확인 및 URL 도출, 열람한 내용에서 실제 파일(소개서 등)이 첨부·다운로드·링크로 존재하는지 확인하세요.
         - 부정확하거나 비공식, 간접경로, 검색엔진 노출 페이지 등 부적격 링크를 포함하면 안 됩니다.
         - 항상 절차적/논리적 추론을 모두 마친 뒤 결과 JSON을 단일 객체로 출력하세요.
         - Output에 reasoning을 포함하거나 JSON 외의 결과를 절대 출력하지 마세요.
 
-        [Reminder: 반드시 공식 홈페이지의 사이트맵/컨텐츠 실열람 및 후보 URL 수집 후, 마지막 단계로 해당 URL에 실제 파일(소개서 등) 존재 및 다운로드/링크 가능 여부를 꼭 확인하세요. reasoning→결론(JSON) 순으로 단계별 내부 추론 완료 후 단일 JSON만 출력하세요. Output 외 정보 표기 금지.]
+        [Reminder: 반드시 공식 홈페이지의 사이트맵/컨텐츠 실열람 및 후보 URL 수집 후, 열람한 내용으로 해당 URL에 실제 파일(소개서 등) 존재 여부를 판단하세요. 최종 URL의 접속·파일 검증은 서버가 자동으로 수행하므로 재열람하지 마세요. reasoning→결론(JSON) 순으로 단계별 내부 추론 완료 후 단일 JSON만 출력하세요. Output 외 정보 표기 금지.]
 
-        (중요 절차 및 목적: 반드시 매체 공식 홈페이지 탐색→사이트맵/정보 메뉴 실확인→후보 URL 추출 후 최종적으로 해당 URL에서 실제 파일(소개서 등) 존재 여부를 확인, 그 후에만 JSON으로 출력할 것. Output은 {"매체명": "[url 또는 찾을 수 없음]"} 단일 JSON 뿐!)
+        (중요 절차 및 목적: 반드시 매체 공식 홈페이지 탐색→사이트맵/정보 메뉴 실확인→후보 URL 추출 후 열람한 내용으로 실제 파일(소개서 등) 존재 여부를 판단, 그 후에만 JSON으로 출력할 것. Output은 {"매체명": "[url 또는 찾을 수 없음]"} 단일 JSON 뿐!)
         """)
     
     def _get_flexible_instructions(self) -> str:
@@ -132,7 +260,7 @@ class MediaKitSearchAgent:
 
         - **다양한 경로 활용**: 공식 홈페이지뿐만 아니라 검색엔진, 중간 허브, 집계 사이트 등 모든 가능한 경로를 통해 정보 수집
         - **정보의 신뢰성 확인**: 찾은 정보가 해당 매체와 관련이 있고 최신 정보인지 확인
-        - **URL 유효성 검증**: 제공하는 URL이 실제로 접근 가능하고 관련 내용을 포함하는지 확인
+        - **URL 유효성 검증**: 최종 URL의 접속 가능 여부(404, 오류 페이지)는 답변 후 서버가 자동으로 검증하므로, 이를 위해 같은 페이지를 다시 열람하지 말 것
         - **포괄적 검색**: 여러 검색어와 다양한 접근 방식을 통해 가능한 모든 자료 탐색
 
         # 허용되는 소스 유형
@@ -159,6 +287,8 @@ class MediaKitSearchAgent:
 
         - **여러 검색 시도**: 첫 번째 검색에서 결과가 없더라도 다른 키워드나 접근법으로 재시도
         - **관련 사이트 탐색**: 직접적인 미디어킷이 없어도 광고 관련 정보나 매체 소개 자료 수집
+        - **사이트맵 확인**: 공식 홈페이지의 사이트맵은 sitemap 도구(공식 도메인 입력)로 한 번에 확인하고, 점수가 높은 URL부터 검증
+        - **후보 일괄 검증**: 후보 URL이 여러 개이면 scrape_many 도구로 한 번에(최대 10개) 열람하여 비교
 
         # Output Format
 
@@ -186,26 +316,71 @@ class MediaKitSearchAgent:
         [Reminder: 다양한 경로(공식 홈페이지, 검색엔진, 중간 허브, 집계 사이트 등)를 모두 활용하여 광고/미디어킷 관련 정보를 찾고, 가장 유용한 결과를 JSON 형태로 출력하세요.]
         """)
 
-    def search_media_kit(self, media_name: str) -> Dict[str, str]:
+    def search_media_kit(
+        self,
+        media_name: str,
+        run: Optional[RunContext] = None,
+        use_registry: bool = True,
+        seed_evidence: bool = False,
+    ) -> Dict[str, str]:
         """
         Search for media kit URL for the given media outlet
         
         Args:
             media_name: Name of the Korean media outlet
+            run: Optional RunContext receiving progress events; cancelling it stops the run
+            use_registry: Try the known-outlet registry before running the agent
+            seed_evidence: Start from the searches and pages already recorded on run
+                (flexible phase of a strict-to-flexible cascade)
             
         Returns:
             Dictionary with media name as key and URL or "찾을 수 없음" as value
+            
+        Raises:
+            SearchCancelledError: If the run was cancelled before it finished
+
+        Note:
+            Budgets set on the RunContext (tool calls, tokens, deadline) stop the tools once
+            exhausted; the model then gets one turn to answer, after which the best verified
+            candidate (or "찾을 수 없음") is returned.
+
+            The final URL is checked with LinkVerifier (HTTP status, file type, attachment
+            links); a dead link is replaced by the best live scraped candidate or "찾을 수 없음".
         """
+        if run is not None:
+            # Make the run visible to the model wrapper and the Firecrawl tools
+            current_run.set(run)
+
         mode_text = "STRICT" if self.strict_mode else "FLEXIBLE"
         logger.info(f"\n{'='*50}")
-        logger.info(f"[AGENT START] Searching media kit for: {media_name} (Mode: {mode_text})")
+        logger.info(f"[AGENT START] Searching media kit for: {media_name} (Mode: {mode_text}, Speed: {self.speed})")
         logger.info(f"{'='*50}")
         
+        if use_registry:
+            try:
+                url = self.registry.resolve(media_name)
+            except Exception as e:
+                # The fast path is an optimization: fall back to the agent
+                logger.warning(f"[AGENT] Registry lookup failed, running the agent: {e}")
+                url = None
+            if url:
+                if run is not None:
+                    run.emit("registry", status="HIT", url=url)
+                logger.info(f"[AGENT RESULT] Resolved from registry without calling the model: {url}")
+                return {media_name: url}
+        
         try:
             # Run the agent with the media name
-            logger.info("[AGENT] Sending query to o3 model...")
-            response = self.agent.run(media_name)
-            logger.info(f"[AGENT RESPONSE] Received response from o3 model")
+            message = media_name
+            if seed_evidence and run is not None:
+                brief = self._evidence_brief(run)
+                if brief:
+                    # The media name stays on the first line of the query
+                    message = f"{media_name}\n\n{brief}"
+                    logger.info(f"[AGENT] Seeded with {len(run.searches)} searches and {len(run.pages)} pages already gathered")
+            logger.info(f"[AGENT] Sending query to {self.agent.model.id} model...")
+            response = self.agent.run(message)
+            logger.info(f"[AGENT RESPONSE] Received response from {self.agent.model.id} model")
             
             # Extract JSON from the response
             if hasattr(response, 'content'):
@@ -217,13 +392,18 @@ class MediaKitSearchAgent:
             
             # Try to parse JSON from the response
             # First, try to find JSON pattern in the response
+            parse_started = time.perf_counter()
             json_pattern = r'\{[^}]+\}'
             json_match = re.search(json_pattern, content)
+            if run is not None:
+                run.emit("parse", duration_ms=round((time.perf_counter() - parse_started) * 1000, 3), content_length=len(content))
             
             if json_match:
                 try:
                     result = json.loads(json_match.group())
                     logger.info(f"[AGENT RESULT] Successfully parsed JSON: {result}")
+                    result = self._verify_result(result, run)
+                    self._feed_registry(media_name, result)
                     return result
                 except json.JSONDecodeError as e:
                     logger.error(f"[AGENT ERROR] JSON decode error: {e}")
@@ -232,16 +412,152 @@ class MediaKitSearchAgent:
             logger.warning(f"[AGENT] Failed to parse JSON, returning default response")
             return {media_name: "찾을 수 없음"}
             
+        except SearchCancelledError:
+            logger.info(f"[AGENT] Search cancelled for: {media_name}")
+            raise
+        except SearchBudgetExceededError as e:
+            # The model did not conclude in its grace turn: answer only with a verified page of the
+            # outlet's known site, by the same rule as a dead answer's replacement
+            best = self._fallback_candidate(run, self._outlet_site(media_name))
+            logger.warning(f"[AGENT] {e}; returning best verified candidate: {best or NOT_FOUND}")
+            return {media_name: best or NOT_FOUND}
         except Exception as e:
             error_msg = str(e)
             logger.error(f"[AGENT ERROR] Unexpected error: {error_msg}")
-            
-            # Check for specific error types
-            if "rate limit" in error_msg.lower():
-                return {media_name: f"에러: Rate limit 초과 - {error_msg}"}
-            elif "context" in error_msg.lower() and "token" in error_msg.lower():
-                return {media_name: f"에러: Context token 초과 - {error_msg}"}
-            elif "api" in error_msg.lower() and "key" in error_msg.lower():
-                return {media_name: f"에러: API 키 문제 - {error_msg}"}
-            else:
-                return {media_name: f"에러: {error_msg}"}
\ No newline at end of file
+            return {media_name: self._error_message(e)}
+
+    @staticmethod
+    def _error_message(error: Exception) -> str:
+        """Classify a failed run by exception type (agno wraps OpenAI errors in ModelProviderError)"""
+        cause = error.__cause__ if isinstance(error, ModelProviderError) and error.__cause__ else error
+        status_code = getattr(error, "status_code", None)
+        if isinstance(cause, openai.RateLimitError) or status_code == 429:
+            # Only reached once the rate limiter's retries were exhausted
+            return f"에러: Rate limit 초과 - {error}"
+        if isinstance(cause, openai.BadRequestError) and cause.code == "context_length_exceeded":
+            return f"에러: Context token 초과 - {error}"
+        if isinstance(cause, (openai.AuthenticationError, openai.PermissionDeniedError)) or status_code in (401, 403):
+            return f"에러: API 키 문제 - {error}"
+        return f"에러: {error}"
+
+    def _verify_result(self, result: Dict[str, str], run: Optional[RunContext]) -> Dict[str, str]:
+        """
+        Check each URL in the agent's answer with LinkVerifier and replace dead ones
+
+        Args:
+            result: Parsed answer {media name: url or "찾을 수 없음"}
+            run: RunContext receiving "verification" events; its scraped candidates are the fallbacks
+
+        Returns:
+            The answer with dead URLs replaced by a verified page of the outlet's own site, or "찾을 수 없음"
+        """
+        verified = {}
+        for name, url in result.items():
+            if not (isinstance(url, str) and url.startswith(("http://", "https://"))):
+                verified[name] = url
+                continue
+            check = self._check_url(url, run)
+            if check["verdict"] != LinkVerifier.DEAD:
+                verified[name] = url
+                continue
+            if run is not None:
+                run.dead_links.append(url)
+            verified[name] = self._fallback_candidate(run, self._outlet_site(name, url), exclude=url) or NOT_FOUND
+            logger.warning(f"[AGENT] {url} is dead ({check['kind']}); answering with {verified[name]}")
+        return verified
+
+    def _outlet_site(self, media_name: str, answer_url: Optional[str] = None) -> Optional[str]:
+        """Official domain of an outlet: the registry's, else (strict mode only) the site of the agent's answer"""
+        try:
+            outlet = self.registry.lookup(media_name)
+        except Exception as e:
+            logger.warning(f"[AGENT] Registry lookup failed for {media_name}: {e}")
+            outlet = None
+        if outlet and outlet.get("domain"):
+            return outlet["domain"]
+        # Strict answers must be on the official site; a flexible answer's host may be a third party
+        return answer_url if self.strict_mode else None
+
+    def _fallback_candidate(self, run: Optional[RunContext], site: Optional[str], exclude: Optional[str] = None) -> Optional[str]:
+        """
+        Best page the agent scraped that can stand in for a missing or dead answer
+
+        Args:
+            run: RunContext holding the scraped candidates (best score first)
+            site: Domain or URL of the outlet's own site; without one nothing qualifies
+            exclude: URL already found dead
+
+        Returns:
+            The highest scoring candidate on the outlet's site that LinkVerifier verified, or None
+        """
+        if run is None or not site:
+            return None
+        candidates = run.verified_candidates
+        for candidate in sorted(candidates, key=candidates.get, reverse=True):
+            # A keyword score alone is not an answer: the page must be on the outlet's site and offer a file
+            if candidate == exclude or not same_site(candidate, site):
+                continue
+            if self._check_url(candidate, run)["verdict"] == LinkVerifier.VERIFIED:
+                return candidate
+        return None
+
+    @staticmethod
+    def _evidence_brief(run: RunContext) -> str:
+        """Describe the evidence a strict run gathered so a flexible run does not redo it"""
+        if not (run.searches or run.pages):
+            return ""
+        lines = ["# 이전 strict 모드 탐색에서 이미 확인한 자료 (같은 검색·열람을 반복하지 말 것)"]
+        if run.searches:
+            lines.append("## 수행한 검색")
+            for query, urls in list(run.searches.items())[:EVIDENCE_MAX_SEARCHES]:
+                lines.append(f"- \"{query}\": {', '.join(urls[:EVIDENCE_URLS_PER_SEARCH])}")
+        if run.pages:
+            lines.append("## 열람한 페이지 (광고 관련도 점수, strict 기준으로는 채택되지 않음)")
+            ranked = sorted(run.pages.items(), key=lambda item: item[1]["score"], reverse=True)
+            for url, page in ranked[:EVIDENCE_MAX_PAGES]:
+                lines.append(f"- {url} (점수 {page['score']}) {page['title']}".rstrip())
+        if run.dead_links:
+            lines.append("## 접속 불가로 확인된 URL (사용 금지)")
+            lines.extend(f"- {url}" for url in run.dead_links)
+        lines.append(
+            "위 페이지 중 flexible 기준에 맞는 것이 있으면 다시 열람하지 말고 바로 답하세요. "
+            "새로운 조사는 검색엔진, 중간 허브, 집계 사이트 등 공식 홈페이지 밖의 경로에 집중하세요."
+        )
+        return "\n".join(lines)
+
+    def _check_url(self, url: str, run: Optional[RunContext]) -> Dict:
+        started = time.perf_counter()
+        try:
+            check = self.verifier.verify(url)
+        except Exception as e:
+            # Verification is best effort; an unexpected failure never discards the answer
+            logger.warning(f"[AGENT] Link verification failed for {url}: {e}")
+            check = {"verdict": LinkVerifier.UNCONFIRMED, "kind": "unreachable", "http_status": None, "attachments": []}
+        if run is not None:
+            run.emit(
+                "verification",
+                url=url,
+                verdict=check["verdict"],
+                kind=check["kind"],
+                http_status=check["http_status"],
+                attachments=len(check["attachments"]),
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+        return check
+
+    def _feed_registry(self, media_name: str, result: Dict[str, str]) -> None:
+        """Remember official URLs found in strict mode so the next lookup skips the agent"""
+        if not self.strict_mode:
+            return
+        for url in result.values():
+            if isinstance(url, str) and url.startswith(("http://", "https://")):
+                # A side effect only: failures are logged and never change the answer
+                try:
+                    # Only answers LinkVerifier confirmed (a file, or a page linking files) skip the agent
+                    # later; the verdict is the cached one from _verify_result
+                    if self.verifier.verify(url)["verdict"] != LinkVerifier.VERIFIED:
+                        logger.info(f"[AGENT] Not recording unconfirmed URL in the registry: {url}")
+                        continue
+                    self.registry.record(media_name, url)
+                except Exception as e:
+                    logger.warning(f"[AGENT] Failed to update registry: {e}")
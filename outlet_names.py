@@ -0,0 +1,241 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import logging
+import os
+import re
+import threading
+import unicodedata
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Words users append to an outlet name that do not change which outlet is meant
+# Only media-kit phrases: a bare "광고" / "advertising" can be part of an outlet's name ("월간 광고")
+DESCRIPTOR_SUFFIXES = (
+    "미디어킷", "미디어 킷", "광고안내", "광고 안내", "광고상품", "광고 상품", "광고단가", "광고요율", "광고단가표",
+    "매체소개서", "회사소개서", "상품소개서", "소개서", "media kit", "mediakit", "media-kit",
+    "rate card", "ratecard",
+)
+CORPORATE_MARKERS = re.compile(r"\(주\)|주식회사|\bco\.?,?\s*ltd\.?|\binc\.?$|\bcorp\.?$", re.I)
+NON_ALNUM = re.compile(r"[^0-9a-z가-힣]+")
+HANGUL_RUNS = re.compile(r"([가-힣]+)")
+
+# Revised Romanization of Hangul syllables (initial, medial, final jamo)
+INITIALS = ("g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h")
+MEDIALS = (
+    "a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo",
+    "u", "wo", "we", "wi", "yu", "eu", "ui", "i",
+)
+FINALS = (
+    "", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l",
+    "p", "l", "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t",
+)
+# Finals in skeletons: written like the Latin consonant folds below ("Hankook" / 한국 -> "hangug")
+SKELETON_FINALS = tuple({"k": "g", "t": "d", "p": "b"}.get(final, final) for final in FINALS)
+
+# Vowel spellings of romanized Korean folded together ("Joongang" / "Jungang", "Chosun" / "Joseon");
+# applied to Hangul and Latin text alike
+VOWEL_FOLDS = (("eo", "u"), ("oo", "u"), ("ou", "u"), ("ae", "e"))
+# Consonant spellings of hand-romanized names folded onto the Revised Romanization ("Kyunghyang" /
+# "Gyeonghyang"); Latin text only, since on romanized Hangul they would merge different outlets
+# (경인 / 경기, 인천 / 전자)
+CONSONANT_FOLDS = (("ch", "j"), ("sh", "s"), ("k", "g"), ("t", "d"), ("p", "b"), ("r", "l"), ("f", "b"))
+
+# Fuzzy matches need a skeleton this long and this much lead over the runner-up outlet
+MIN_FUZZY_LENGTH = 4
+AMBIGUITY_MARGIN = 0.05
+
+
+class NameMatch(NamedTuple):
+    """Outcome of OutletNameIndex.resolve"""
+
+    canonical: str
+    score: float
+    # "exact" (same key), "romanized" (same Latin skeleton), "fuzzy" (n-gram similarity) or "new"
+    method: str
+
+
+def clean_name(name: str) -> str:
+    """NFKC, collapsed whitespace, corporate markers and trailing descriptors ("미디어킷", ...) removed"""
+    cleaned = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", name)).strip()
+    cleaned = CORPORATE_MARKERS.sub(" ", cleaned).strip()
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in DESCRIPTOR_SUFFIXES:
+            if cleaned.casefold().endswith(suffix) and len(cleaned) > len(suffix):
+                cleaned = cleaned[:-len(suffix)].rstrip(" -_/,")
+                stripped = True
+    # A name that is nothing but descriptors is kept as typed
+    return cleaned or re.sub(r"\s+", " ", unicodedata.normalize("NFKC", name)).strip()
+
+
+def name_key(name: str) -> str:
+    """Comparison key: cleaned, case-folded, letters and digits only ("중앙 일보" -> "중앙일보")"""
+    return NON_ALNUM.sub("", clean_name(name).casefold())
+
+
+def romanize(text: str, finals: Tuple[str, ...] = FINALS) -> str:
+    """Romanize Hangul syllables (Revised Romanization, no sound-change rules); other characters pass through"""
+    parts = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            parts.append(INITIALS[code // 588] + MEDIALS[(code % 588) // 28] + finals[code % 28])
+        else:
+            parts.append(char)
+    return "".join(parts)
+
+
+def fold(text: str, folds: Tuple[Tuple[str, str], ...]) -> str:
+    for variant, replacement in folds:
+        text = text.replace(variant, replacement)
+    return text
+
+
+def skeleton(name: str) -> str:
+    """Script-independent form of a name: romanized, spelling variants folded, doubled letters collapsed"""
+    parts = []
+    # Odd items are Hangul runs ("한국경제tv" -> "", "한국경제", "tv")
+    for i, part in enumerate(HANGUL_RUNS.split(name_key(name))):
+        if i % 2:
+            parts.append(fold(romanize(part, SKELETON_FINALS), VOWEL_FOLDS))
+        else:
+            parts.append(fold(fold(part, VOWEL_FOLDS), CONSONANT_FOLDS))
+    return re.sub(r"(.)\1+", r"\1", "".join(parts))
+
+
+def is_hangul(name: str) -> bool:
+    """Whether a name contains Hangul (its script for fuzzy matching; otherwise it is Latin)"""
+    return HANGUL_RUNS.search(name_key(name)) is not None
+
+
+def bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class OutletNameIndex:
+    """In-memory alias index resolving name variants (spacing, suffixes, Hangul / Latin spellings) to one canonical name
+
+    Names in the same script only match on their cleaned key, so 경인일보 / 경기일보 or
+    한국경제 / 한국경제TV stay apart; skeletons and fuzzy similarity bridge Hangul and Latin.
+    """
+
+    _shared: Optional["OutletNameIndex"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, threshold: float = 0.9, max_names: int = 50000):
+        # Minimum Dice similarity of skeleton bigrams for a fuzzy (cross-script) match
+        self.threshold = threshold
+        self.max_names = max_names
+        self._by_key: Dict[str, str] = {}
+        self._by_skeleton: Dict[str, str] = {}
+        # Skeletons built from names containing Hangul (the others are Latin)
+        self._hangul: Set[str] = set()
+        # bigram -> skeletons containing it (candidate lookup for fuzzy matches)
+        self._grams: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "OutletNameIndex":
+        """Create an index configured from OUTLET_NAME_* environment variables"""
+        return cls(
+            threshold=float(os.getenv("OUTLET_NAME_MATCH_THRESHOLD", "0.9")),
+            max_names=int(os.getenv("OUTLET_NAME_INDEX_MAX", "50000")),
+        )
+
+    @classmethod
+    def shared(cls) -> "OutletNameIndex":
+        """Process-wide instance"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_env()
+            return cls._shared
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def add(self, name: str, canonical: Optional[str] = None) -> None:
+        """
+        Register a name (or alias) of an outlet
+
+        Args:
+            name: Name or alias as users may type it
+            canonical: Canonical outlet name (default: the cleaned name itself)
+
+        Note:
+            The first canonical name registered for a key wins, so load the registry first.
+        """
+        canonical = canonical or clean_name(name)
+        key, sk = name_key(name), skeleton(name)
+        if not key:
+            return
+        with self._lock:
+            if key in self._by_key:
+                return
+            if len(self._by_key) >= self.max_names:
+                return
+            self._by_key[key] = canonical
+            if sk and sk not in self._by_skeleton:
+                self._by_skeleton[sk] = canonical
+                if is_hangul(name):
+                    self._hangul.add(sk)
+                for gram in bigrams(sk):
+                    self._grams.setdefault(gram, set()).add(sk)
+
+    def load(self, names: Iterable[Tuple[str, str]]) -> int:
+        """Register (name, canonical) pairs; returns the index size afterwards"""
+        for name, canonical in names:
+            self.add(name, canonical)
+        return len(self)
+
+    def resolve(self, name: str, learn: bool = True) -> NameMatch:
+        """
+        Map a user-typed name to the canonical outlet name
+
+        Args:
+            name: Media name as entered by the user
+            learn: Register an unmatched name as a new canonical outlet (fuzzy matches are never learned)
+
+        Returns:
+            NameMatch; for unmatched names the canonical name is the cleaned input
+        """
+        key, sk, hangul = name_key(name), skeleton(name), is_hangul(name)
+        with self._lock:
+            if key in self._by_key:
+                return NameMatch(self._by_key[key], 1.0, "exact")
+            # Only a transliteration in the other script may share a skeleton
+            if sk and sk in self._by_skeleton and (sk in self._hangul) != hangul:
+                return NameMatch(self._by_skeleton[sk], 1.0, "romanized")
+            match = self._fuzzy(sk, hangul)
+        if match is not None:
+            # Not learned: a wrong guess must not become a permanent alias
+            logger.info(f"[NAMES] '{name}' -> '{match.canonical}' (similarity {match.score:.2f})")
+            return match
+        canonical = clean_name(name)
+        if learn:
+            self.add(name, canonical)
+        return NameMatch(canonical, 0.0, "new")
+
+    def _fuzzy(self, sk: str, hangul: bool) -> Optional[NameMatch]:
+        """Best canonical name in the other script by bigram Dice similarity, if clearly above the threshold"""
+        if len(sk) < MIN_FUZZY_LENGTH:
+            return None
+        grams = bigrams(sk)
+        candidates: Set[str] = set()
+        for gram in grams:
+            candidates |= self._grams.get(gram, set())
+        scores: Dict[str, float] = {}
+        for candidate in candidates:
+            if len(candidate) < MIN_FUZZY_LENGTH or (candidate in self._hangul) == hangul:
+                continue
+            other = bigrams(candidate)
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            canonical = self._by_skeleton[candidate]
+            scores[canonical] = max(score, scores.get(canonical, 0.0))
+        ranked: List[Tuple[str, float]] = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] < self.threshold:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < AMBIGUITY_MARGIN:
+            # Two outlets look alike (e.g. a shared "일보" tail): do not guess
+            return None
+        return NameMatch(ranked[0][0], ranked[0][1], "fuzzy")
@@ -0,0 +1,190 @@
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import json
+import logging
+import os
+import threading
+import time
+
+from link_verifier import LinkVerifier
+from result_cache import normalize_media_name
+from storage import SQLiteStore, data_path
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outlet_registry.json")
+
+
+def site_domain(url: str) -> str:
+    """Host of a URL without a leading "www." """
+    host = urlsplit(url if "://" in url else f"https://{url}").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class OutletRegistry:
+    """Known outlets (aliases -> official domain -> media-kit URLs) consulted before the agent runs"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS outlets (
+        name TEXT PRIMARY KEY,
+        domain TEXT,
+        media_kit_url TEXT,
+        url_patterns TEXT NOT NULL DEFAULT '[]',
+        verified_at REAL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS outlet_aliases (
+        alias_key TEXT PRIMARY KEY,
+        name TEXT NOT NULL
+    );
+    """
+
+    _shared: Optional["OutletRegistry"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str,
+        seed_path: Optional[str] = SEED_PATH,
+        verify_ttl: float = 24 * 3600,
+        verifier: Optional[LinkVerifier] = None,
+    ):
+        self.store = SQLiteStore(path, self.schema)
+        self.verify_ttl = verify_ttl
+        self.verifier = verifier or LinkVerifier.shared()
+        if seed_path and os.path.exists(seed_path):
+            self._load_seed(seed_path)
+
+    @classmethod
+    def from_env(cls) -> "OutletRegistry":
+        """Create a registry configured from OUTLET_REGISTRY_* environment variables"""
+        return cls(
+            path=os.getenv("OUTLET_REGISTRY_PATH") or data_path("outlet_registry.sqlite3"),
+            verify_ttl=float(os.getenv("OUTLET_REGISTRY_VERIFY_TTL", str(24 * 3600))),
+        )
+
+    @classmethod
+    def shared(cls) -> "OutletRegistry":
+        """Process-wide instance used by MediaKitSearchAgent unless another registry is injected"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_env()
+            return cls._shared
+
+    def _load_seed(self, seed_path: str) -> None:
+        """Insert seed outlets that are not in the database yet (learned data wins)"""
+        with open(seed_path, encoding="utf-8") as f:
+            seed = json.load(f)
+        conn = self.store.connection()
+        now = time.time()
+        for outlet in seed.get("outlets", []):
+            conn.execute(
+                "INSERT OR IGNORE INTO outlets (name, domain, media_kit_url, url_patterns, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (outlet["name"], outlet.get("domain"), outlet.get("media_kit_url"),
+                 json.dumps(outlet.get("url_patterns", []), ensure_ascii=False), now),
+            )
+            for alias in [outlet["name"], *outlet.get("aliases", [])]:
+                conn.execute(
+                    "INSERT OR IGNORE INTO outlet_aliases (alias_key, name) VALUES (?, ?)",
+                    (normalize_media_name(alias), outlet["name"]),
+                )
+
+    def lookup(self, media_name: str) -> Optional[Dict[str, Any]]:
+        """Return the registered outlet for a media name or alias, or None"""
+        conn = self.store.connection()
+        row = conn.execute(
+            "SELECT o.* FROM outlet_aliases a JOIN outlets o ON o.name = a.name WHERE a.alias_key = ?",
+            (normalize_media_name(media_name),),
+        ).fetchone()
+        if row is None:
+            return None
+        outlet = dict(row)
+        outlet["url_patterns"] = json.loads(outlet["url_patterns"] or "[]")
+        return outlet
+
+    def aliases(self) -> List[Tuple[str, str]]:
+        """(normalized alias, outlet name) pairs, outlet names first"""
+        conn = self.store.connection()
+        names = [(row["name"], row["name"]) for row in conn.execute("SELECT name FROM outlets")]
+        aliases = [(row["alias_key"], row["name"]) for row in conn.execute("SELECT alias_key, name FROM outlet_aliases")]
+        return names + aliases
+
+    def candidates(self, outlet: Dict[str, Any]) -> List[str]:
+        """Known media-kit URL first, then the outlet's URL patterns expanded with its domain"""
+        urls = [outlet["media_kit_url"]] if outlet.get("media_kit_url") else []
+        if outlet.get("domain"):
+            urls.extend(pattern.format(domain=outlet["domain"]) for pattern in outlet["url_patterns"])
+        return list(dict.fromkeys(urls))
+
+    def resolve(self, media_name: str) -> Optional[str]:
+        """
+        Fast path: return a verified media-kit URL for a registered outlet
+
+        Args:
+            media_name: Media name as entered by the user
+
+        Returns:
+            The first candidate URL that verifies, or None (unknown outlet / nothing verifies)
+        """
+        outlet = self.lookup(media_name)
+        if outlet is None:
+            return None
+
+        for url in self.candidates(outlet):
+            # The stored URL was verified recently enough: no network round-trip at all
+            if url == outlet["media_kit_url"] and outlet["verified_at"] and time.time() - outlet["verified_at"] < self.verify_ttl:
+                logger.info(f"[REGISTRY] {media_name} -> {url} (verified {time.time() - outlet['verified_at']:.0f}s ago)")
+                return url
+            if self.verify(url):
+                self._mark_verified(outlet["name"], url)
+                logger.info(f"[REGISTRY] {media_name} -> {url} (verified now)")
+                return url
+
+        logger.info(f"[REGISTRY] {media_name} is registered but no candidate verified")
+        return None
+
+    def verify(self, url: str) -> bool:
+        """Whether LinkVerifier confirms the URL (a file, or a page linking files); ad vocabulary alone is not enough"""
+        return self.verifier.verify(url)["verdict"] == LinkVerifier.VERIFIED
+
+    def record(self, media_name: str, url: str) -> None:
+        """
+        Feed the registry with a URL the agent found in strict mode and LinkVerifier classified as VERIFIED
+
+        Args:
+            media_name: Media name as entered by the user (becomes the outlet name if unknown)
+            url: Official media-kit URL
+        """
+        outlet = self.lookup(media_name)
+        name = outlet["name"] if outlet else media_name.strip()
+        now = time.time()
+        conn = self.store.connection()
+        conn.execute(
+            "INSERT INTO outlets (name, domain, media_kit_url, verified_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET media_kit_url = excluded.media_kit_url, "
+            "domain = COALESCE(outlets.domain, excluded.domain), verified_at = excluded.verified_at, updated_at = excluded.updated_at",
+            (name, site_domain(url), url, now, now),
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO outlet_aliases (alias_key, name) VALUES (?, ?)",
+            (normalize_media_name(media_name), name),
+        )
+        logger.info(f"[REGISTRY] Recorded {name} -> {url}")
+
+    def invalidate(self, url: str) -> int:
+        """Force a fresh check of a stored media-kit URL found dead; returns the number of outlets affected"""
+        cursor = self.store.connection().execute(
+            "UPDATE outlets SET verified_at = NULL, updated_at = ? WHERE media_kit_url = ?",
+            (time.time(), url),
+        )
+        if cursor.rowcount:
+            logger.info(f"[REGISTRY] Invalidated {url}")
+        return cursor.rowcount
+
+    def _mark_verified(self, name: str, url: str) -> None:
+        now = time.time()
+        self.store.connection().execute(
+            "UPDATE outlets SET media_kit_url = ?, verified_at = ?, updated_at = ? WHERE name = ?",
+            (url, now, now, name),
+        )
@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+import os
+import re
+
+# Vocabulary that marks ad / media-kit related content (matched case-insensitively)
+AD_KEYWORDS = (
+    "광고", "미디어킷", "미디어 킷", "제휴", "소개서", "매체소개", "매체 소개", "요율", "단가",
+    "media kit", "mediakit", "media-kit", "advertis", "rate card", "ratecard", "sponsor",
+    ".pdf", ".ppt", ".pptx", ".zip", "다운로드", "download",
+)
+
+LINK_PATTERN = re.compile(r'\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+HEADING_PATTERN = re.compile(r"^#{1,6}\s")
+
+TRUNCATION_MARKER = "\n\n[... 글자 수 제한으로 이하 생략 ...]"
+
+DEFAULT_CHAR_BUDGET = int(os.getenv("SCRAPE_CHAR_BUDGET", "12000"))
+
+
+def keyword_score(text: str) -> int:
+    """Number of distinct ad/media-kit keywords found in the text"""
+    text = text.casefold()
+    return sum(1 for keyword in AD_KEYWORDS if keyword in text)
+
+
+def extract_links(markdown: str, base_url: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Extract unique markdown links in document order
+
+    Args:
+        markdown: Markdown content
+        base_url: Page URL used to resolve relative links
+
+    Returns:
+        List of {"text", "url"} dicts (images and in-page anchors skipped)
+    """
+    links = []
+    seen = set()
+    for match in LINK_PATTERN.finditer(markdown):
+        text, url = match.group(1).strip(), match.group(2).strip()
+        if url.startswith(("#", "javascript:", "mailto:", "tel:", "data:")):
+            continue
+        if markdown[max(match.start() - 1, 0):match.start()] == "!":
+            continue  # image
+        if base_url:
+            url = urljoin(base_url, url)
+        if url in seen:
+            continue
+        seen.add(url)
+        links.append({"text": text, "url": url})
+    return links
+
+
+def _split_blocks(markdown: str) -> List[str]:
+    """Split markdown into blocks: each heading starts a block, blank lines end one"""
+    blocks: List[str] = []
+    current: List[str] = []
+    for line in markdown.splitlines():
+        if HEADING_PATTERN.match(line) or not line.strip():
+            if current:
+                blocks.append("\n".join(current))
+            current = [line] if line.strip() else []
+        else:
+            current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def _is_link_list(block: str) -> bool:
+    """True for navigation-style blocks that are mostly links"""
+    without_links = LINK_PATTERN.sub("", block)
+    stripped = re.sub(r"[\s|*\-•·>]+", "", without_links)
+    return len(stripped) < 0.2 * max(len(re.sub(r"\s+", "", block)), 1)
+
+
+def condense_markdown(
+    markdown: str,
+    base_url: Optional[str] = None,
+    char_budget: int = DEFAULT_CHAR_BUDGET,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Reduce a scraped page to the parts relevant for finding a media kit
+
+    Keeps the page title, every link whose text or URL matches the ad/media-kit
+    vocabulary, and the text blocks that mention it; repeated boilerplate
+    (navigation, footers) is dropped, and the output is cut at char_budget.
+    Pages already within the budget are returned unchanged.
+
+    Args:
+        markdown: Raw markdown returned by Firecrawl
+        base_url: Page URL used to resolve relative links
+        char_budget: Maximum number of characters returned
+
+    Returns:
+        (condensed markdown, stats with chars_in / chars_out / links / ad_links / blocks_kept)
+    """
+    stats = {"chars_in": len(markdown), "chars_out": len(markdown), "links": 0, "ad_links": 0, "blocks_kept": 0}
+    if len(markdown) <= char_budget:
+        return markdown, stats
+
+    links = extract_links(markdown, base_url)
+    ad_links = sorted(
+        (link for link in links if keyword_score(f"{link['text']} {link['url']}") > 0),
+        key=lambda link: -keyword_score(f"{link['text']} {link['url']}"),
+    )
+
+    # Keep keyword-bearing prose blocks, each distinct block once, skipping link-only nav blocks
+    seen_blocks = set()
+    kept_blocks = []
+    title = ""
+    for block in _split_blocks(markdown):
+        normalized = re.sub(r"\s+", " ", block).strip()
+        if not title and HEADING_PATTERN.match(block):
+            title = block.splitlines()[0].strip()
+        if normalized in seen_blocks:
+            continue
+        seen_blocks.add(normalized)
+        if keyword_score(block) > 0 and not _is_link_list(block):
+            kept_blocks.append(block)
+
+    sections = []
+    if title:
+        sections.append(title)
+    if ad_links:
+        rows = "\n".join(f"| {link['text'] or '-'} | {link['url']} |" for link in ad_links)
+        sections.append(f"## 광고/미디어킷 관련 링크\n| 텍스트 | URL |\n|---|---|\n{rows}")
+    if kept_blocks:
+        sections.append("## 광고/미디어킷 관련 본문\n" + "\n\n".join(kept_blocks))
+    other_links = [link for link in links if link not in ad_links]
+    if other_links:
+        rows = "\n".join(f"- [{link['text'] or '-'}]({link['url']})" for link in other_links)
+        sections.append(f"## 기타 링크 ({len(other_links)}개)\n{rows}")
+
+    condensed = "\n\n".join(sections)
+    if len(condensed) > char_budget:
+        condensed = condensed[:max(char_budget - len(TRUNCATION_MARKER), 0)] + TRUNCATION_MARKER
+
+    stats.update({
+        "chars_out": len(condensed),
+        "links": len(links),
+        "ad_links": len(ad_links),
+        "blocks_kept": len(kept_blocks),
+    })
+    return condensed, stats
@@ -0,0 +1,259 @@
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+
+import httpx
+
+from run_context import current_run
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# Statuses worth retrying (the OpenAI SDK's own list); only 429 shrinks the concurrency window
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+THROTTLED_STATUS = 429
+
+# Per-provider defaults, overridable with <PROVIDER>_RATE_LIMIT_* environment variables
+PROVIDER_DEFAULTS: Dict[str, Dict[str, float]] = {
+    "openai": {"RPS": 8, "BURST": 16, "CONCURRENCY": 32},
+    "firecrawl": {"RPS": 10, "BURST": 20, "CONCURRENCY": 32},
+}
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Seconds to wait from Retry-After (seconds or HTTP date) or OpenAI's retry-after-ms header"""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class KeyLimiter:
+    """Token bucket plus an AIMD concurrency window for one API key"""
+
+    # Minimum seconds between two multiplicative decreases (one burst of 429s halves once)
+    DECREASE_COOLDOWN = 2.0
+
+    def __init__(self, rate: float, burst: float, max_concurrency: int):
+        # rate <= 0 disables the bucket
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit = self.max_concurrency
+        self.tokens = self.burst
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._refilled_at = time.monotonic()
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        """Block until a token and a concurrency slot are free; returns the seconds waited"""
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.rate > 0:
+                    self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if now < self.paused_until:
+                    timeout = self.paused_until - now
+                elif self.in_flight >= self.limit:
+                    timeout = 1.0
+                elif self.rate > 0 and self.tokens < 1:
+                    timeout = (1 - self.tokens) / self.rate
+                else:
+                    if self.rate > 0:
+                        self.tokens -= 1
+                    self.in_flight += 1
+                    return now - started
+                self._cond.wait(timeout)
+
+    def release(self, throttled: bool, retry_after: Optional[float] = None) -> None:
+        """Return the slot; a 429 halves the window and pauses the key, successes grow it by one per window"""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self._successes = 0
+                if now - self._last_decrease >= self.DECREASE_COOLDOWN:
+                    self.limit = max(1, self.limit // 2)
+                    self._last_decrease = now
+                    logger.warning(f"[RATE LIMIT] Throttled, concurrency window now {self.limit}")
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            elif self.limit < self.max_concurrency:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+class RateLimiter:
+    """Per-API-key token buckets, adaptive concurrency and jittered retries for one provider"""
+
+    _shared: Dict[str, "RateLimiter"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        provider: str,
+        rate: float = 10,
+        burst: float = 20,
+        max_concurrency: int = 32,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        max_wait: float = 120.0,
+    ):
+        self.provider = provider
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Total seconds a call may spend sleeping between retries
+        self.max_wait = max_wait
+        self._keys: Dict[str, KeyLimiter] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, provider: str) -> "RateLimiter":
+        """Create a limiter configured from <PROVIDER>_RATE_LIMIT_* environment variables"""
+        prefix = f"{provider.upper()}_RATE_LIMIT"
+        defaults = PROVIDER_DEFAULTS.get(provider, PROVIDER_DEFAULTS["firecrawl"])
+        return cls(
+            provider,
+            rate=float(os.getenv(f"{prefix}_RPS", str(defaults["RPS"]))),
+            burst=float(os.getenv(f"{prefix}_BURST", str(defaults["BURST"]))),
+            max_concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", str(int(defaults["CONCURRENCY"])))),
+            max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", "4")),
+            max_wait=float(os.getenv(f"{prefix}_MAX_WAIT", "120")),
+        )
+
+    @classmethod
+    def shared(cls, provider: str) -> "RateLimiter":
+        """Process-wide limiter of a provider ("openai" or "firecrawl")"""
+        with cls._shared_lock:
+            if provider not in cls._shared:
+                cls._shared[provider] = cls.from_env(provider)
+            return cls._shared[provider]
+
+    def for_key(self, api_key: str) -> KeyLimiter:
+        """Limiter state of one API key (keys are only kept hashed)"""
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            limiter = self._keys.get(key)
+            if limiter is None:
+                limiter = self._keys[key] = KeyLimiter(self.rate, self.burst, self.max_concurrency)
+            return limiter
+
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Retry-After when the provider sent one, else exponential backoff with equal jitter"""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def call(
+        self,
+        api_key: str,
+        send: Callable[[], R],
+        retry_exceptions: Tuple[Type[BaseException], ...] = (),
+    ) -> R:
+        """
+        Send a request through the key's bucket and window, retrying throttled and transient failures
+
+        Args:
+            api_key: Key the provider rate limits on
+            send: Performs the request and returns a response with status_code and headers
+            retry_exceptions: Exceptions raised by send that are safe to retry (connection failures)
+
+        Returns:
+            The first non-retryable response, or the last response once retries are exhausted
+        """
+        limiter = self.for_key(api_key)
+        waited = 0.0
+        attempt = 0
+        while True:
+            queued = limiter.acquire()
+            try:
+                response = send()
+            except retry_exceptions as e:
+                limiter.release(throttled=False)
+                status, retry_after, response, error = None, None, None, e
+            except BaseException:
+                limiter.release(throttled=False)
+                raise
+            else:
+                status = response.status_code
+                retry_after = parse_retry_after(response.headers) if status in RETRY_STATUSES else None
+                limiter.release(throttled=status == THROTTLED_STATUS, retry_after=retry_after)
+                error = None
+                if status not in RETRY_STATUSES:
+                    return response
+
+            delay = self.backoff(attempt, retry_after)
+            run = current_run.get()
+            give_up = attempt >= self.max_retries or waited + delay > self.max_wait or (run is not None and run.cancelled)
+            if run is not None:
+                run.emit(
+                    "retry",
+                    provider=self.provider,
+                    status=status if status is not None else type(error).__name__,
+                    attempt=attempt + 1,
+                    delay_ms=0 if give_up else round(delay * 1000, 1),
+                    queued_ms=round(queued * 1000, 1),
+                    gave_up=give_up,
+                )
+            if give_up:
+                logger.warning(f"[RATE LIMIT] {self.provider}: giving up after {attempt + 1} attempts (last: {status or error})")
+                if error is not None:
+                    raise error
+                return response
+            logger.info(f"[RATE LIMIT] {self.provider}: {status or type(error).__name__}, retry {attempt + 1} in {delay:.1f}s")
+            if response is not None:
+                # Free the connection of the failed attempt
+                response.close()
+            time.sleep(delay)
+            waited += delay
+            attempt += 1
+
+
+class RateLimitedTransport(httpx.HTTPTransport):
+    """httpx transport passing every request through a RateLimiter keyed by the Authorization header"""
+
+    def __init__(self, limiter: RateLimiter, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.limiter.call(
+            request.headers.get("Authorization", ""),
+            lambda: super(RateLimitedTransport, self).handle_request(request),
+            # Failures before the request reached the server
+            retry_exceptions=(httpx.ConnectError, httpx.ConnectTimeout),
+        )
@@ -0,0 +1,418 @@
+"""
+Background refresh of the most requested outlets' media-kit URLs
+
+Runs inside the app (REFRESH_ENABLED=true, see main.lifespan) or as its own process:
+    python refresh_scheduler.py          # loop, refreshing off-peak every REFRESH_INTERVAL
+    python refresh_scheduler.py --once   # one cycle now, then exit
+Both share the data directory with the API, so refreshed results land in the same result cache.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+from link_verifier import LinkVerifier
+from outlet_registry import OutletRegistry
+from result_cache import ResultCache, classify_result, result_value
+from run_context import RunContext
+from storage import SQLiteStore, data_path
+from tracing import Metrics, request_id
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 3600
+
+# Entries are re-resolved once this share of their cache TTL has passed, before users see them expire
+REFRESH_AHEAD_FRACTION = 0.8
+
+
+def parse_hours(value: str) -> Optional[Tuple[int, int]]:
+    """Parse an off-peak window of local hours ("2-6", or "22-6" across midnight); empty means any hour"""
+    if not value.strip():
+        return None
+    start, end = (int(part) % 24 for part in value.split("-", 1))
+    return start, end
+
+
+def in_window(hours: Optional[Tuple[int, int]], now: Optional[datetime] = None) -> bool:
+    """Whether the local hour falls in the [start, end) window"""
+    if hours is None:
+        return True
+    hour = (now or datetime.now()).hour
+    start, end = hours
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class OutletPopularity:
+    """Daily request counts per canonical outlet and search mode, shared by all workers"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS outlet_requests (
+        name TEXT NOT NULL,
+        strict_mode INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        requests INTEGER NOT NULL,
+        PRIMARY KEY (name, strict_mode, day)
+    );
+    """
+
+    def __init__(self, path: str, window_days: int = 14):
+        self.store = SQLiteStore(path, self.schema)
+        # Popularity is the number of requests in the last window_days days
+        self.window_days = window_days
+
+    @classmethod
+    def from_env(cls) -> "OutletPopularity":
+        """Create the counter configured from REFRESH_* environment variables"""
+        return cls(
+            path=os.getenv("REFRESH_DB_PATH") or data_path("refresh.sqlite3"),
+            window_days=int(os.getenv("REFRESH_WINDOW_DAYS", "14")),
+        )
+
+    def record(self, name: str, strict_mode: bool) -> None:
+        """Count one user request for a canonical outlet name; never raises"""
+        try:
+            self.store.connection().execute(
+                "INSERT INTO outlet_requests (name, strict_mode, day, requests) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(name, strict_mode, day) DO UPDATE SET requests = requests + 1",
+                (name, int(strict_mode), int(time.time() // DAY)),
+            )
+        except Exception as e:
+            logger.warning(f"[REFRESH] Failed to count request for {name}: {e}")
+
+    def top(self, limit: int) -> List[Tuple[str, bool, int]]:
+        """(name, strict_mode, requests) of the most requested outlets in the window, most requested first"""
+        rows = self.store.connection().execute(
+            "SELECT name, strict_mode, SUM(requests) AS requests FROM outlet_requests WHERE day > ? "
+            "GROUP BY name, strict_mode ORDER BY requests DESC, name LIMIT ?",
+            (int(time.time() // DAY) - self.window_days, limit),
+        ).fetchall()
+        return [(row["name"], bool(row["strict_mode"]), row["requests"]) for row in rows]
+
+    def purge(self) -> int:
+        """Delete counts older than the window; returns the number of rows removed"""
+        cursor = self.store.connection().execute(
+            "DELETE FROM outlet_requests WHERE day <= ?", (int(time.time() // DAY) - self.window_days,)
+        )
+        return cursor.rowcount
+
+
+class RefreshScheduler:
+    """Re-resolves the most requested outlets off-peak so user searches hit fresh result-cache entries"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS refresh_cycles (
+        id TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        started_at REAL NOT NULL,
+        lease_until REAL NOT NULL
+    );
+    """
+
+    # A running cycle renews its lease every LEASE_TTL / 3; another process takes over once it expires
+    LEASE_TTL = 300
+
+    def __init__(
+        self,
+        search: Callable[..., Awaitable[Tuple[Dict[str, str], str]]],
+        popularity: OutletPopularity,
+        result_cache: ResultCache,
+        metrics: Metrics,
+        openai_api_key: str,
+        firecrawl_api_key: str,
+        registry: Optional[OutletRegistry] = None,
+        verifier: Optional[LinkVerifier] = None,
+        top_n: int = 50,
+        interval: float = 3600,
+        hours: Optional[Tuple[int, int]] = (2, 6),
+        concurrency: int = 2,
+        max_searches: int = 20,
+        max_cycle_tokens: int = 5000000,
+        max_age: float = 3 * DAY,
+        speed: str = "quality",
+        budget: Optional[Dict[str, Optional[float]]] = None,
+    ):
+        # main.run_search: the same cache and agent path as user requests (without the registry fast path)
+        self.search = search
+        self.popularity = popularity
+        self.result_cache = result_cache
+        self.metrics = metrics
+        self.openai_api_key = openai_api_key
+        self.firecrawl_api_key = firecrawl_api_key
+        self.registry = registry or OutletRegistry.shared()
+        self.verifier = verifier or LinkVerifier.shared()
+        self.top_n = top_n
+        # Minimum seconds between the starts of two cycles (across all processes)
+        self.interval = interval
+        self.hours = hours
+        self.concurrency = concurrency
+        # Per-cycle limits on agent runs and the tokens they spend
+        self.max_searches = max_searches
+        self.max_cycle_tokens = max_cycle_tokens
+        # Results older than this are re-resolved even when their URL is still alive
+        self.max_age = max_age
+        self.speed = speed
+        # RunContext budgets of each refresh search
+        self.budget = budget or {}
+        self.store = SQLiteStore(popularity.store.path, self.schema)
+        self._owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+        self._searches = 0
+        self._tokens = 0
+
+    @classmethod
+    def from_env(
+        cls,
+        search: Callable[..., Awaitable[Tuple[Dict[str, str], str]]],
+        popularity: OutletPopularity,
+        result_cache: ResultCache,
+        metrics: Metrics,
+    ) -> "RefreshScheduler":
+        """Create a scheduler configured from REFRESH_* variables, using OPENAI_API_KEY / FIRECRAWL_API_KEY"""
+        return cls(
+            search,
+            popularity,
+            result_cache,
+            metrics,
+            openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+            firecrawl_api_key=os.getenv("FIRECRAWL_API_KEY", ""),
+            top_n=int(os.getenv("REFRESH_TOP_N", "50")),
+            interval=float(os.getenv("REFRESH_INTERVAL", "3600")),
+            hours=parse_hours(os.getenv("REFRESH_HOURS", "2-6")),
+            concurrency=int(os.getenv("REFRESH_CONCURRENCY", "2")),
+            max_searches=int(os.getenv("REFRESH_MAX_SEARCHES", "20")),
+            max_cycle_tokens=int(os.getenv("REFRESH_MAX_CYCLE_TOKENS", "5000000")),
+            max_age=float(os.getenv("REFRESH_MAX_AGE", str(3 * DAY))),
+            speed=os.getenv("REFRESH_SPEED", "quality"),
+            budget={
+                "max_tool_calls": int(os.getenv("REFRESH_MAX_TOOL_CALLS", "25")) or None,
+                "max_tokens": int(os.getenv("REFRESH_MAX_TOKENS", "400000")) or None,
+                "deadline_seconds": float(os.getenv("REFRESH_DEADLINE_SECONDS", "600")) or None,
+            },
+        )
+
+    def start(self) -> None:
+        """Start the background loop in the running event loop"""
+        if not self.openai_api_key:
+            logger.warning("[REFRESH] OPENAI_API_KEY is not set, refresh scheduler not started")
+            return
+        self._task = asyncio.create_task(self.run_forever())
+        hours = f"{self.hours[0]:02d}-{self.hours[1]:02d}h" if self.hours else "any hour"
+        logger.info(f"[REFRESH] Scheduler started (top {self.top_n} outlets, every {self.interval:.0f}s, {hours})")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_forever(self) -> None:
+        """Run a cycle whenever one is due inside the off-peak hours"""
+        while True:
+            try:
+                if in_window(self.hours):
+                    await self.run_cycle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[REFRESH] Cycle failed: {e}")
+            # Cycles are claimed through the shared lease, so polling more often than interval is harmless
+            await asyncio.sleep(min(self.interval, 300))
+
+    async def run_cycle(self, force: bool = False) -> Optional[Dict[str, int]]:
+        """
+        Check the most requested outlets and re-resolve the stale or dead ones
+
+        Args:
+            force: Ignore REFRESH_HOURS and the interval since the last cycle (a running cycle still wins)
+
+        Returns:
+            Number of outlets per outcome, or None when another process owns the cycle or it is not due
+        """
+        owner = f"{self._owner_prefix}:{uuid.uuid4().hex[:8]}"
+        # SQLite calls (busy timeout up to 30s) run off the event loop the API shares
+        if not await asyncio.to_thread(self._claim, owner, force):
+            return None
+        # Log lines of this cycle carry its id
+        request_id.set(f"refresh-{owner[-8:]}")
+        heartbeat = asyncio.create_task(self._heartbeat(owner))
+        started = time.perf_counter()
+        try:
+            purged = await asyncio.to_thread(self.popularity.purge)
+            outlets = await asyncio.to_thread(self.popularity.top, self.top_n)
+            logger.info(f"[REFRESH] Cycle started: {len(outlets)} outlets to check ({purged} old counts purged)")
+            self._searches = self._tokens = 0
+            semaphore = asyncio.Semaphore(max(self.concurrency, 1))
+            outcomes = await asyncio.gather(*(
+                self._refresh(name, strict_mode, requests, semaphore, force) for name, strict_mode, requests in outlets
+            ))
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(self._release, owner)
+            await asyncio.to_thread(self.metrics.flush)
+
+        counts = dict(Counter(outcomes))
+        logger.info(
+            f"[REFRESH] Cycle finished in {time.perf_counter() - started:.0f}s: {counts} "
+            f"({self._searches} searches, {self._tokens} tokens)"
+        )
+        return counts
+
+    async def _refresh(
+        self,
+        name: str,
+        strict_mode: bool,
+        requests: int,
+        semaphore: asyncio.Semaphore,
+        force: bool,
+    ) -> str:
+        """Refresh one outlet; returns the outcome"""
+        async with semaphore:
+            reason, outcome = None, "fresh"
+            if not force and not in_window(self.hours):
+                outcome = "deferred"
+            else:
+                cached = await asyncio.to_thread(self.result_cache.get, name, strict_mode)
+                reason = await self._stale_reason(cached)
+                if reason is None:
+                    outcome = "fresh"
+                elif self._searches >= self.max_searches or self._tokens >= self.max_cycle_tokens:
+                    outcome = "deferred"
+                else:
+                    self._searches += 1
+                    logger.info(f"[REFRESH] Re-resolving {name} ({'strict' if strict_mode else 'flexible'}, {reason}, {requests} requests)")
+                    outcome = await self._resolve(name, strict_mode, reason, cached[0] if cached else None)
+            self.metrics.inc("media_kit_refresh_total", reason=reason or "none", outcome=outcome)
+            return outcome
+
+    async def _stale_reason(self, cached: Optional[Tuple[str, float]]) -> Optional[str]:
+        """"missing", "dead" or "stale" when the cached result needs a new search, else None"""
+        if cached is None:
+            return "missing"
+        value, stored_at = cached
+        kind = classify_result(value)
+        if kind == "error":
+            return "missing"
+        if kind == "found":
+            # A fresh check: the cached verdict may be as old as the result itself
+            check = await asyncio.to_thread(self.verifier.verify, value, True)
+            if check["verdict"] == LinkVerifier.DEAD:
+                # Keep the registry fast path from answering with the dead URL
+                await asyncio.to_thread(self.registry.invalidate, value)
+                return "dead"
+        if time.time() - stored_at >= min(self.max_age, self.result_cache.ttls[kind] * REFRESH_AHEAD_FRACTION):
+            return "stale"
+        return None
+
+    async def _resolve(self, name: str, strict_mode: bool, reason: str, old: Optional[str]) -> str:
+        """Search an outlet again and store the result unless it is worse than the cached one"""
+        run = RunContext(**self.budget)
+        try:
+            result, _ = await self.search(
+                name,
+                openai_api_key=self.openai_api_key,
+                firecrawl_api_key=self.firecrawl_api_key,
+                strict_mode=strict_mode,
+                # Stored below, so a failed search never replaces a good entry
+                cache_mode="bypass",
+                run=run,
+                speed=self.speed,
+                count_request=False,
+                # The registry would hand back the stored URL and hide a moved media kit
+                use_registry=False,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[REFRESH] {name}: search failed ({e}), keeping the cached result")
+            return "failed"
+        finally:
+            self._tokens += run.tokens
+
+        value = result_value(result)
+        kind = classify_result(value)
+        old_kind = classify_result(old) if old is not None else None
+        if kind == "error" or (kind == "not_found" and run.budget_hit is not None):
+            logger.warning(f"[REFRESH] {name}: no usable result ({value}), keeping the cached result")
+            return "failed"
+        if kind == "not_found" and old_kind == "found" and reason != "dead":
+            # The cached URL is still alive: one unlucky run does not replace it
+            await asyncio.to_thread(self.result_cache.set, name, strict_mode, old)
+            return "kept"
+        await asyncio.to_thread(self.result_cache.set, name, strict_mode, value)
+        if kind == "not_found":
+            return "not_found"
+        if value == old:
+            return "unchanged"
+        if old_kind == "found":
+            logger.info(f"[REFRESH] {name}: media kit URL changed {old} -> {value}")
+            return "changed"
+        return "new"
+
+    def _claim(self, owner: str, force: bool) -> bool:
+        """Take the cycle lease when no cycle runs and the last one started at least interval ago"""
+        now = time.time()
+        conn = self.store.connection()
+        conn.execute(
+            "INSERT INTO refresh_cycles (id, owner, started_at, lease_until) VALUES ('cycle', ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET owner = excluded.owner, started_at = excluded.started_at, "
+            "lease_until = excluded.lease_until WHERE refresh_cycles.lease_until < ? AND refresh_cycles.started_at <= ?",
+            (owner, now, now + self.LEASE_TTL, now, now if force else now - self.interval),
+        )
+        row = conn.execute("SELECT owner FROM refresh_cycles WHERE id = 'cycle'").fetchone()
+        return row is not None and row["owner"] == owner
+
+    def _release(self, owner: str) -> None:
+        # started_at stays, so the next cycle is due interval after this one started
+        self.store.connection().execute(
+            "UPDATE refresh_cycles SET lease_until = 0 WHERE id = 'cycle' AND owner = ?", (owner,)
+        )
+
+    def _renew(self, owner: str) -> None:
+        self.store.connection().execute(
+            "UPDATE refresh_cycles SET lease_until = ? WHERE id = 'cycle' AND owner = ?",
+            (time.time() + self.LEASE_TTL, owner),
+        )
+
+    async def _heartbeat(self, owner: str) -> None:
+        while True:
+            await asyncio.sleep(self.LEASE_TTL / 3)
+            await asyncio.to_thread(self._renew, owner)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh the most requested outlets' media-kit URLs in the result cache")
+    parser.add_argument("--once", action="store_true", help="Run one cycle now (ignores REFRESH_HOURS / REFRESH_INTERVAL) and exit")
+    args = parser.parse_args()
+
+    # The API module provides the search path, caches and metrics (and loads .env, configures logging)
+    import main as api
+
+    scheduler = RefreshScheduler.from_env(api.run_search, api.outlet_popularity, api.result_cache, api.metrics)
+    if not scheduler.openai_api_key:
+        parser.error("OPENAI_API_KEY is not set")
+
+    async def run() -> None:
+        if not args.once:
+            await scheduler.run_forever()
+        elif await scheduler.run_cycle(force=True) is None:
+            logger.warning("[REFRESH] Another process is running a refresh cycle")
+
+    try:
+        asyncio.run(run())
+    finally:
+        api.search_executor.shutdown(wait=False)
+        api.agent_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from storage import SQLiteStore, data_path
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = "찾을 수 없음"
+ERROR_PREFIX = "에러:"
+
+
+def normalize_media_name(media_name: str) -> str:
+    """Normalize a media name for cache keys (NFKC, collapsed whitespace, case-folded)"""
+    name = unicodedata.normalize("NFKC", media_name)
+    return re.sub(r"\s+", " ", name).strip().casefold()
+
+
+def classify_result(value: str) -> str:
+    """Classify a result value as "found", "not_found" or "error" """
+    if value.startswith(ERROR_PREFIX):
+        return "error"
+    if not value or value == NOT_FOUND:
+        return "not_found"
+    return "found"
+
+
+def result_value(result: Dict[str, str]) -> str:
+    """Extract the URL / "찾을 수 없음" / error value from an agent result"""
+    for value in result.values():
+        return str(value)
+    return NOT_FOUND
+
+
+class ResultCache:
+    """Two-level cache for search_media_kit results: in-process LRU in front of SQLite"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS results (
+        cache_key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        stored_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at);
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_memory_entries: int = 1024,
+        ttl_found: float = 7 * 24 * 3600,
+        ttl_not_found: float = 12 * 3600,
+        ttl_error: float = 60,
+        memory_ttl: float = 5,
+    ):
+        self.store = SQLiteStore(path, self.schema)
+        self.max_memory_entries = max_memory_entries
+        # Seconds an in-memory entry is served before SQLite is read again, so results rewritten by
+        # another worker or process (cache=refresh, the refresh scheduler) show up quickly
+        self.memory_ttl = memory_ttl
+        self.ttls = {
+            "found": ttl_found,
+            "not_found": ttl_not_found,
+            "error": ttl_error,
+        }
+        # cache_key -> (value, stored_at, expires_at, remembered_at)
+        self._memory: "OrderedDict[str, Tuple[str, float, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Create a cache configured from RESULT_CACHE_* environment variables"""
+        return cls(
+            path=os.getenv("RESULT_CACHE_PATH") or data_path("result_cache.sqlite3"),
+            max_memory_entries=int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "1024")),
+            ttl_found=float(os.getenv("RESULT_CACHE_TTL_FOUND", str(7 * 24 * 3600))),
+            ttl_not_found=float(os.getenv("RESULT_CACHE_TTL_NOT_FOUND", str(12 * 3600))),
+            ttl_error=float(os.getenv("RESULT_CACHE_TTL_ERROR", "60")),
+            memory_ttl=float(os.getenv("RESULT_CACHE_MEMORY_TTL", "5")),
+        )
+
+    @staticmethod
+    def key(media_name: str, strict_mode: bool) -> str:
+        mode = "strict" if strict_mode else "flexible"
+        return f"{mode}:{normalize_media_name(media_name)}"
+
+    def get(self, media_name: str, strict_mode: bool) -> Optional[Tuple[str, float]]:
+        """
+        Look up a cached result
+
+        Args:
+            media_name: Media name as entered by the user
+            strict_mode: Search mode the result was produced with
+
+        Returns:
+            (value, stored_at) or None on a miss / expired entry
+        """
+        cache_key = self.key(media_name, strict_mode)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is not None:
+                value, stored_at, expires_at, remembered_at = entry
+                if expires_at > now and now - remembered_at < self.memory_ttl:
+                    self._memory.move_to_end(cache_key)
+                    return value, stored_at
+                del self._memory[cache_key]
+
+        row = self.store.connection().execute(
+            "SELECT value, stored_at, expires_at FROM results WHERE cache_key = ? AND expires_at > ?",
+            (cache_key, now),
+        ).fetchone()
+        if row is None:
+            return None
+
+        self._remember(cache_key, row["value"], row["stored_at"], row["expires_at"])
+        return row["value"], row["stored_at"]
+
+    def set(self, media_name: str, strict_mode: bool, value: str) -> None:
+        """Store a result with the TTL of its kind (found / not_found / error)"""
+        kind = classify_result(value)
+        ttl = self.ttls[kind]
+        if ttl <= 0:
+            return
+
+        cache_key = self.key(media_name, strict_mode)
+        stored_at = time.time()
+        expires_at = stored_at + ttl
+        self.store.connection().execute(
+            "INSERT OR REPLACE INTO results (cache_key, value, kind, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (cache_key, value, kind, stored_at, expires_at),
+        )
+        self._remember(cache_key, value, stored_at, expires_at)
+        logger.info(f"[RESULT CACHE] Stored {kind} result for {cache_key} (ttl={ttl:.0f}s)")
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the shared store; returns the number removed"""
+        cursor = self.store.connection().execute(
+            "DELETE FROM results WHERE expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def _remember(self, cache_key: str, value: str, stored_at: float, expires_at: float) -> None:
+        with self._lock:
+            self._memory[cache_key] = (value, stored_at, expires_at, time.time())
+            self._memory.move_to_end(cache_key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,140 @@
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Event types that carry URL lists rather than timings; kept out of the trace
+UNTRACED_EVENTS = {"candidates"}
+MAX_TRACE_EVENTS = 500
+
+# Model turns allowed after a budget is exhausted (tools disabled) for the agent to answer
+BUDGET_GRACE_TURNS = 1
+
+
+class SearchCancelledError(Exception):
+    """Raised inside an agent run once its RunContext was cancelled"""
+
+
+class SearchBudgetExceededError(Exception):
+    """Raised inside an agent run that kept going after its budget and grace turn were used up"""
+
+
+class RunContext:
+    """Per-search state shared by the agent run loop, the model and the Firecrawl tools"""
+
+    def __init__(
+        self,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        max_tool_calls: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+    ):
+        self.on_event = on_event
+        self.started = time.monotonic()
+        self.model_turns = 0
+        self.tool_calls = 0
+        self.tokens = 0
+        # Budgets (None = unlimited); the deadline counts from the start of the request
+        self.max_tool_calls = max_tool_calls
+        self.max_tokens = max_tokens
+        self.deadline = self.started + deadline_seconds if deadline_seconds else None
+        self.budget_hit: Optional[str] = None
+        self._grace_turns = 0
+        # Scraped pages that look like ad / media-kit pages: url -> relevance score (fallback answers
+        # must still pass MediaKitSearchAgent._fallback_candidate)
+        self.verified_candidates: Dict[str, int] = {}
+        # Evidence gathered by the tools, handed to the flexible phase of a cascade:
+        # search query -> result URLs, scraped url -> {"title", "score"}, and answers found dead
+        self.searches: Dict[str, List[str]] = {}
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.dead_links: List[str] = []
+        # Set once a strict search fell through to the seeded flexible phase
+        self.cascaded = False
+        # Canonical outlet name the search ran under (see outlet_names.OutletNameIndex)
+        self.canonical_name: Optional[str] = None
+        # Timing events (model turns, tool calls, parse, cache) in order; see tracing.record_run
+        self.trace: List[Dict[str, Any]] = []
+        self._cancelled = threading.Event()
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started) * 1000
+
+    def emit(self, event_type: str, **data: Any) -> None:
+        """Record the event in the trace and publish it to the listener (if any); never raises"""
+        event = {"type": event_type, "elapsed_ms": round(self.elapsed_ms, 1), **data}
+        if event_type not in UNTRACED_EVENTS and len(self.trace) < MAX_TRACE_EVENTS:
+            self.trace.append(dict(event))
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(event)
+        except Exception as e:
+            logger.warning(f"[RUN] Event listener failed: {e}")
+
+    def cancel(self) -> None:
+        """Ask the run to stop at the next model turn or tool call"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise SearchCancelledError("Search was cancelled")
+
+    def check_budget(self) -> Optional[str]:
+        """Return the exhausted budget ("tool_calls", "tokens" or "deadline"), or None"""
+        if self.budget_hit is None:
+            if self.max_tool_calls is not None and self.tool_calls >= self.max_tool_calls:
+                self.budget_hit = "tool_calls"
+            elif self.max_tokens is not None and self.tokens >= self.max_tokens:
+                self.budget_hit = "tokens"
+            elif self.deadline is not None and time.monotonic() >= self.deadline:
+                self.budget_hit = "deadline"
+            if self.budget_hit is not None:
+                logger.info(f"[RUN] Budget exhausted: {self.budget_hit} (tool calls {self.tool_calls}, tokens {self.tokens})")
+                self.emit("budget", budget=self.budget_hit, tool_calls=self.tool_calls, tokens=self.tokens)
+        return self.budget_hit
+
+    def start_model_turn(self) -> bool:
+        """
+        Gate a model turn on cancellation and budgets
+
+        Returns:
+            True if this is the grace turn in which the model must answer without tools
+
+        Raises:
+            SearchCancelledError: The run was cancelled
+            SearchBudgetExceededError: A budget is exhausted and the grace turn was used
+        """
+        self.check_cancelled()
+        if self.check_budget() is None:
+            return False
+        if self._grace_turns >= BUDGET_GRACE_TURNS:
+            raise SearchBudgetExceededError(f"Search budget exhausted: {self.budget_hit}")
+        self._grace_turns += 1
+        return True
+
+    def add_candidate(self, url: str, score: int) -> None:
+        """Remember a scraped page that looks like an ad / media-kit page"""
+        if score > 0:
+            self.verified_candidates[url] = max(score, self.verified_candidates.get(url, 0))
+
+    def record_search(self, query: str, urls: List[str]) -> None:
+        """Remember a search and the URLs it returned"""
+        self.searches[query] = urls
+
+    def record_page(self, url: str, title: str, score: int) -> None:
+        """Remember a successfully scraped page and its ad / media-kit relevance score"""
+        self.pages[url] = {"title": title, "score": score}
+        self.add_candidate(url, score)
+
+
+# RunContext of the search executing in the current thread / task
+current_run: ContextVar[Optional[RunContext]] = ContextVar("current_run", default=None)
@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SearchQueueFullError(Exception):
+    """Raised when the executor already holds the maximum number of searches"""
+
+
+class SearchExecutorClosedError(Exception):
+    """Raised when a search is submitted after the executor was shut down"""
+
+
+class SearchExecutor:
+    """Bounded thread pool that keeps blocking agent runs off the event loop"""
+
+    def __init__(self, max_concurrency: int = 32, max_queue: int = 64):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="media-kit-search",
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0  # running + waiting for a free thread
+        self._closed = False
+
+    @classmethod
+    def from_env(cls) -> "SearchExecutor":
+        """Create an executor configured from SEARCH_MAX_CONCURRENCY / SEARCH_MAX_QUEUE"""
+        return cls(
+            max_concurrency=int(os.getenv("SEARCH_MAX_CONCURRENCY", "32")),
+            max_queue=int(os.getenv("SEARCH_MAX_QUEUE", "64")),
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Current load of the executor"""
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": min(in_flight, self.max_concurrency),
+            "queued": max(in_flight - self.max_concurrency, 0),
+        }
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise SearchExecutorClosedError("Search executor is shutting down")
+            if self._in_flight >= self.max_concurrency + self.max_queue:
+                raise SearchQueueFullError(
+                    f"Too many searches in flight ({self._in_flight}), try again later"
+                )
+            self._in_flight += 1
+
+    def _release(self, _future: Future) -> None:
+        # Called from the worker thread once the blocking call has really finished,
+        # so a cancelled HTTP request does not free a slot that is still busy.
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking callable on the pool and await its result
+
+        Args:
+            func: Blocking callable (e.g. MediaKitSearchAgent.search_media_kit)
+            *args, **kwargs: Arguments forwarded to the callable
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            SearchQueueFullError: If running + queued searches exceed the configured limits
+            SearchExecutorClosedError: If the executor was shut down
+        """
+        self._acquire()
+        # Carry context variables (request id, run context, ...) into the worker thread
+        context = contextvars.copy_context()
+        try:
+            future = self._pool.submit(functools.partial(context.run, func, *args, **kwargs))
+        except RuntimeError:
+            self._release(None)
+            raise SearchExecutorClosedError("Search executor is shutting down")
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting searches and release the worker threads"""
+        with self._lock:
+            self._closed = True
+        logger.info(f"[EXECUTOR] Shutting down (wait={wait})")
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,148 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+from run_context import SearchCancelledError
+from storage import SQLiteStore, data_path
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent identical searches within a worker (futures) and across workers (SQLite leases)"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS leases (
+        lease_key TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str, lease_ttl: float = 120, poll_interval: float = 2.0):
+        self.store = SQLiteStore(path, self.schema)
+        # A leader renews its lease every lease_ttl / 3; followers take over once it expires
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        """Create a coalescer configured from SINGLE_FLIGHT_* environment variables"""
+        return cls(
+            path=os.getenv("SINGLE_FLIGHT_PATH") or data_path("single_flight.sqlite3"),
+            lease_ttl=float(os.getenv("SINGLE_FLIGHT_LEASE_TTL", "120")),
+            poll_interval=float(os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", "2")),
+        )
+
+    async def do(
+        self,
+        key: str,
+        leader: Callable[[], Awaitable[T]],
+        shared_result: Callable[[], Optional[T]],
+    ) -> Tuple[T, str]:
+        """
+        Run leader() once per key; concurrent callers wait for its result
+
+        Args:
+            key: Coalescing key (normalized media name + mode)
+            leader: Coroutine factory doing the actual search
+            shared_result: Reads the result a leader in another worker published (e.g. the result cache);
+                called in a worker thread
+
+        Returns:
+            (result, role) where role is "leader", "follower" or "remote-follower"
+        """
+        while True:
+            future = self._inflight.get(key)
+            if future is not None:
+                try:
+                    return await asyncio.shield(future), "follower"
+                except SearchCancelledError:
+                    # The leader's client went away; try again (possibly as the new leader)
+                    continue
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                result, role = await self._lead_or_follow(key, leader, shared_result)
+                future.set_result(result)
+                return result, role
+            except BaseException as e:
+                future.set_exception(e if isinstance(e, Exception) else SearchCancelledError("Search was cancelled"))
+                # Avoid "exception was never retrieved" when nobody is waiting
+                future.exception()
+                raise
+            finally:
+                self._inflight.pop(key, None)
+
+    async def _lead_or_follow(
+        self,
+        key: str,
+        leader: Callable[[], Awaitable[T]],
+        shared_result: Callable[[], Optional[T]],
+    ) -> Tuple[T, str]:
+        owner = f"{self._owner_prefix}:{uuid.uuid4().hex[:8]}"
+        # Lease queries and shared_result() hit SQLite (busy timeout up to 30s): run them off the event loop
+        while True:
+            if await asyncio.to_thread(self._try_acquire, key, owner):
+                heartbeat = asyncio.create_task(self._heartbeat(key, owner))
+                try:
+                    return await leader(), "leader"
+                finally:
+                    heartbeat.cancel()
+                    await asyncio.to_thread(self._release, key, owner)
+
+            # Another worker is running this search: wait for its published result
+            logger.info(f"[SINGLE FLIGHT] Waiting for another worker's search: {key}")
+            while await asyncio.to_thread(self._lease_alive, key):
+                await asyncio.sleep(self.poll_interval)
+                result = await asyncio.to_thread(shared_result)
+                if result is not None:
+                    return result, "remote-follower"
+            result = await asyncio.to_thread(shared_result)
+            if result is not None:
+                return result, "remote-follower"
+            logger.info(f"[SINGLE FLIGHT] Lease released without a result, taking over: {key}")
+
+    def _try_acquire(self, key: str, owner: str) -> bool:
+        now = time.time()
+        conn = self.store.connection()
+        conn.execute(
+            "INSERT INTO leases (lease_key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(lease_key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < ?",
+            (key, owner, now + self.lease_ttl, now),
+        )
+        row = conn.execute("SELECT owner FROM leases WHERE lease_key = ?", (key,)).fetchone()
+        return row is not None and row["owner"] == owner
+
+    def _lease_alive(self, key: str) -> bool:
+        row = self.store.connection().execute(
+            "SELECT 1 FROM leases WHERE lease_key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def _release(self, key: str, owner: str) -> None:
+        self.store.connection().execute(
+            "DELETE FROM leases WHERE lease_key = ? AND owner = ?", (key, owner)
+        )
+
+    def _renew(self, key: str, owner: str) -> None:
+        self.store.connection().execute(
+            "UPDATE leases SET expires_at = ? WHERE lease_key = ? AND owner = ?",
+            (time.time() + self.lease_ttl, key, owner),
+        )
+
+    async def _heartbeat(self, key: str, owner: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            await asyncio.to_thread(self._renew, key, owner)
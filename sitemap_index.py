@@ -0,0 +1,185 @@
+from collections import deque
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote, urljoin, urlsplit
+import gzip
+import io
+import logging
+import re
+import xml.etree.ElementTree as ET
+
+import requests
+
+from page_condenser import keyword_score
+from url_guard import guarded_session, same_site
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; MediaKitSearchBot/1.0)"
+
+# Path segments that typically host ad / company information pages
+AD_PATH_SEGMENTS = {
+    "ad", "ads", "adinfo", "advert", "advertise", "advertising", "mediakit", "media_kit",
+    "brochure", "partnership", "sponsor", "company", "about", "intro", "pr",
+}
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def site_root(domain: str) -> str:
+    """Turn "joongang.co.kr", "https://www.joongang.co.kr/x" etc. into "https://host" """
+    domain = domain.strip()
+    if "://" not in domain:
+        domain = f"https://{domain}"
+    parts = urlsplit(domain)
+    return f"{parts.scheme or 'https'}://{parts.netloc.lower()}"
+
+
+def score_url(url: str) -> int:
+    """Relevance of a sitemap URL for media-kit discovery (0 = unrelated)"""
+    path = unquote(urlsplit(url).path).casefold()
+    segments = {segment for segment in re.split(r"[/_.\-]+", path) if segment}
+    return 2 * keyword_score(path) + len(segments & AD_PATH_SEGMENTS)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class _LimitedReader(io.RawIOBase):
+    """File-like wrapper that stops reading after max_bytes"""
+
+    def __init__(self, stream: Any, max_bytes: int):
+        self.stream = stream
+        self.remaining = max_bytes
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self.remaining <= 0:
+            return 0
+        data = self.stream.read(min(len(buffer), self.remaining))
+        self.remaining -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class SitemapIndexer:
+    """Fetch robots.txt / sitemap.xml (indexes and .gz included) and rank URLs without an LLM"""
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: float = 10,
+        max_sitemaps: int = 30,
+        max_urls: int = 200000,
+        max_bytes_per_sitemap: int = 50 * 1024 * 1024,
+        keep: int = 500,
+    ):
+        # Sitemap URLs come from the sites themselves: only public hosts are fetched
+        self.session = session or guarded_session()
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps
+        self.max_urls = max_urls
+        self.max_bytes_per_sitemap = max_bytes_per_sitemap
+        # Number of scored URLs kept per domain (the cached index)
+        self.keep = keep
+
+    def build(self, domain: str) -> Dict[str, Any]:
+        """
+        Build the ranked sitemap index of a site
+
+        Args:
+            domain: Domain or any URL of the site
+
+        Returns:
+            {"domain", "sitemaps", "total_urls", "urls": [{"url", "score"}]} with only
+            scored URLs (highest first, at most `keep`)
+        """
+        root = site_root(domain)
+        queue = deque(self._sitemaps_from_robots(root) or [f"{root}/sitemap.xml", f"{root}/sitemap_index.xml"])
+        visited: List[str] = []
+        scored: List[Dict[str, Any]] = []
+        total = 0
+
+        while queue and len(visited) < self.max_sitemaps and total < self.max_urls:
+            sitemap_url = queue.popleft()
+            if sitemap_url in visited:
+                continue
+            visited.append(sitemap_url)
+            try:
+                for kind, loc in self._iter_locs(sitemap_url):
+                    if kind == "sitemap":
+                        if not same_site(loc, root):
+                            logger.info(f"[SITEMAP] Skipping off-site sitemap {loc}")
+                            continue
+                        # News sites list thousands of article sitemaps; read page/menu-like ones first
+                        if score_url(loc) > 0 or re.search(r"page|menu|static|main|company", loc, re.I):
+                            queue.appendleft(loc)
+                        else:
+                            queue.append(loc)
+                        continue
+                    total += 1
+                    score = score_url(loc)
+                    if score > 0:
+                        scored.append({"url": loc, "score": score})
+                    if total >= self.max_urls:
+                        break
+            except (requests.RequestException, ET.ParseError, OSError, EOFError) as e:
+                logger.warning(f"[SITEMAP] Failed to read {sitemap_url}: {e}")
+
+        scored.sort(key=lambda item: (-item["score"], len(item["url"])))
+        logger.info(f"[SITEMAP] {root}: {len(visited)} sitemaps, {total} URLs, {len(scored)} scored")
+        return {
+            "domain": root,
+            "sitemaps": visited,
+            "total_urls": total,
+            "urls": scored[:self.keep],
+        }
+
+    def _sitemaps_from_robots(self, root: str) -> List[str]:
+        try:
+            response = self.session.get(f"{root}/robots.txt", timeout=self.timeout, headers={"User-Agent": USER_AGENT})
+        except requests.RequestException as e:
+            logger.warning(f"[SITEMAP] robots.txt unavailable for {root}: {e}")
+            return []
+        if response.status_code != 200:
+            return []
+        sitemaps = []
+        for line in response.text.splitlines():
+            if line.lower().startswith("sitemap:"):
+                sitemap_url = urljoin(root + "/", line.split(":", 1)[1].strip())
+                # robots.txt may point anywhere; only the requested site's sitemaps are read
+                if same_site(sitemap_url, root):
+                    sitemaps.append(sitemap_url)
+                else:
+                    logger.info(f"[SITEMAP] Skipping off-site sitemap {sitemap_url} in {root}/robots.txt")
+        return sitemaps
+
+    def _iter_locs(self, sitemap_url: str):
+        """Stream-parse one sitemap, yielding ("sitemap" | "url", loc) with bounded memory"""
+        with self.session.get(sitemap_url, timeout=self.timeout, stream=True, headers={"User-Agent": USER_AGENT}) as response:
+            if response.status_code != 200:
+                logger.info(f"[SITEMAP] {sitemap_url} returned {response.status_code}")
+                return
+            # Content-Encoding is undone by urllib3; .xml.gz files are gzip bodies themselves
+            response.raw.decode_content = True
+            stream = io.BufferedReader(_LimitedReader(response.raw, self.max_bytes_per_sitemap))
+            if stream.peek(2)[:2] == GZIP_MAGIC:
+                stream = gzip.GzipFile(fileobj=stream)
+
+            kind = "url"
+            root = None
+            for event, element in ET.iterparse(stream, events=("start", "end")):
+                name = _local_name(element.tag)
+                if event == "start":
+                    if root is None:
+                        root = element
+                        kind = "sitemap" if name == "sitemapindex" else "url"
+                    continue
+                if name == "loc" and element.text:
+                    yield kind, element.text.strip()
+                elif name in ("url", "sitemap"):
+                    # Drop processed entries so memory stays flat for huge sitemaps
+                    root.clear()
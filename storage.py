@@ -0,0 +1,63 @@
+from typing import Optional
+import logging
+import os
+import sqlite3
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on the host (e.g. another gunicorn worker)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def data_path(filename: str) -> str:
+    """
+    Resolve a file inside the local data directory (MEDIA_KIT_DATA_DIR, default ./data)
+
+    Args:
+        filename: Name of the database or cache file
+
+    Returns:
+        Absolute path; the directory is created if needed
+    """
+    data_dir = os.path.abspath(os.getenv("MEDIA_KIT_DATA_DIR", "data"))
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, filename)
+
+
+class SQLiteStore:
+    """SQLite database shared by all gunicorn workers on a host"""
+
+    def __init__(self, path: str, schema: str = ""):
+        self.path = path
+        # DDL executed on every new connection (use CREATE ... IF NOT EXISTS)
+        self.schema = schema
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Per-thread, per-process connection
+
+        gunicorn preloads the app and forks workers afterwards, so a connection is
+        never reused across processes; the pid check reopens it after a fork.
+        """
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self.schema:
+                conn.executescript(self.schema)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -0,0 +1,64 @@
+import pytest
+
+from outlet_names import OutletNameIndex, clean_name, name_key
+
+OUTLETS = ["경기일보", "전자신문", "한국경제", "서울경제", "연합뉴스", "중앙일보", "조선일보", "경향신문", "한국일보"]
+
+
+@pytest.fixture
+def index() -> OutletNameIndex:
+    index = OutletNameIndex()
+    index.load((name, name) for name in OUTLETS)
+    return index
+
+
+@pytest.mark.parametrize("name, other", [
+    ("경인일보", "경기일보"),
+    ("인천신문", "전자신문"),
+    ("한국경제TV", "한국경제"),
+    ("서울경제TV", "서울경제"),
+    ("연합뉴스TV", "연합뉴스"),
+])
+def test_different_outlets_stay_apart(index, name, other):
+    match = index.resolve(name)
+    assert match.method == "new"
+    assert match.canonical == name
+    # Resolving again (after learning) still keeps both outlets apart
+    assert index.resolve(name).canonical == name
+    assert index.resolve(other).canonical == other
+
+
+def test_batch_names_resolve_to_distinct_outlets(index):
+    names = ["경기일보", "경인일보", "한국경제", "한국경제TV"]
+    assert len({index.resolve(name).canonical for name in names}) == 4
+
+
+@pytest.mark.parametrize("name, canonical", [
+    ("중앙 일보", "중앙일보"),
+    ("중앙일보 미디어킷", "중앙일보"),
+    ("(주)조선일보", "조선일보"),
+    ("JoongAng Ilbo", "중앙일보"),
+    ("Chosun Ilbo", "조선일보"),
+    ("Kyunghyang Shinmun", "경향신문"),
+    ("Hankook Ilbo", "한국일보"),
+])
+def test_variants_resolve_to_canonical(index, name, canonical):
+    assert index.resolve(name).canonical == canonical
+
+
+def test_tv_is_part_of_the_name():
+    assert clean_name("한국경제TV") == "한국경제TV"
+    assert name_key("한국경제 TV 미디어킷") == "한국경제tv"
+
+
+def test_only_media_kit_phrases_are_stripped():
+    assert clean_name("중앙일보 광고안내") == "중앙일보"
+    assert clean_name("월간 광고") == "월간 광고"
+    assert clean_name("Digital Advertising") == "Digital Advertising"
+
+
+def test_fuzzy_matches_are_not_learned(index):
+    # A Latin spelling close to, but not equal to, a Hangul outlet's skeleton
+    match = index.resolve("Kyunghyang Sinmum", learn=True)
+    assert (match.canonical, match.method) == ("경향신문", "fuzzy")
+    assert name_key("Kyunghyang Sinmum") not in index._by_key
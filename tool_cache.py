@@ -0,0 +1,148 @@
+from typing import Any, Optional
+from urllib.parse import urlsplit, urlunsplit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+
+from storage import SQLiteStore, data_path
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query (NFKC, collapsed whitespace, case-folded)"""
+    query = unicodedata.normalize("NFKC", query)
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for cache keys (lower-case scheme/host, no fragment)"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+class ToolCache:
+    """Size-bounded, TTL-based cache of Firecrawl tool responses stored zlib-compressed in SQLite"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS tool_cache (
+        namespace TEXT NOT NULL,
+        cache_key TEXT NOT NULL,
+        payload BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        stored_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        accessed_at REAL NOT NULL,
+        PRIMARY KEY (namespace, cache_key)
+    );
+    CREATE INDEX IF NOT EXISTS tool_cache_accessed_at ON tool_cache (accessed_at);
+    """
+
+    # Run the size check every N writes instead of on every write
+    EVICTION_INTERVAL = 50
+
+    _shared: Optional["ToolCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, ttls: Optional[dict] = None):
+        self.store = SQLiteStore(path, self.schema)
+        self.max_bytes = max_bytes
+        # Per-namespace TTLs in seconds; unknown namespaces fall back to "default"
+        self.ttls = {"default": 24 * 3600}
+        self.ttls.update(ttls or {})
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ToolCache":
+        """Create a cache configured from TOOL_CACHE_* environment variables"""
+        return cls(
+            path=os.getenv("TOOL_CACHE_PATH") or data_path("tool_cache.sqlite3"),
+            max_bytes=int(float(os.getenv("TOOL_CACHE_MAX_MB", "256")) * 1024 * 1024),
+            ttls={
+                "search": float(os.getenv("TOOL_CACHE_TTL_SEARCH", str(6 * 3600))),
+                "scrape": float(os.getenv("TOOL_CACHE_TTL_SCRAPE", str(24 * 3600))),
+                "sitemap": float(os.getenv("TOOL_CACHE_TTL_SITEMAP", str(7 * 24 * 3600))),
+                "verify": float(os.getenv("TOOL_CACHE_TTL_VERIFY", str(24 * 3600))),
+            },
+        )
+
+    @classmethod
+    def shared(cls) -> "ToolCache":
+        """Process-wide instance used by FirecrawlTools unless another cache is injected"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_env()
+            return cls._shared
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, cache_key: str) -> Optional[Any]:
+        """Return the cached JSON value or None on a miss / expired entry"""
+        now = time.time()
+        conn = self.store.connection()
+        row = conn.execute(
+            "SELECT payload FROM tool_cache WHERE namespace = ? AND cache_key = ? AND expires_at > ?",
+            (namespace, cache_key, now),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE tool_cache SET accessed_at = ? WHERE namespace = ? AND cache_key = ?",
+            (now, namespace, cache_key),
+        )
+        return json.loads(zlib.decompress(row["payload"]).decode("utf-8"))
+
+    def set(self, namespace: str, cache_key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value under the namespace TTL (or an explicit ttl)"""
+        if ttl is None:
+            ttl = self.ttls.get(namespace, self.ttls["default"])
+        if ttl <= 0:
+            return
+
+        payload = zlib.compress(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+        now = time.time()
+        self.store.connection().execute(
+            "INSERT OR REPLACE INTO tool_cache "
+            "(namespace, cache_key, payload, size, stored_at, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (namespace, cache_key, payload, len(payload), now, now + ttl, now),
+        )
+
+        with self._lock:
+            self._writes += 1
+            run_eviction = self._writes % self.EVICTION_INTERVAL == 0
+        if run_eviction:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        conn = self.store.connection()
+        removed = conn.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tool_cache").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            rows = conn.execute(
+                "SELECT namespace, cache_key, size FROM tool_cache ORDER BY accessed_at"
+            ).fetchall()
+            victims = []
+            for row in rows:
+                if excess <= 0:
+                    break
+                victims.append((row["namespace"], row["cache_key"]))
+                excess -= row["size"]
+            conn.executemany("DELETE FROM tool_cache WHERE namespace = ? AND cache_key = ?", victims)
+            removed += len(victims)
+        if removed:
+            logger.info(f"[TOOL CACHE] Evicted {removed} entries")
+        return removed
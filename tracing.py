@@ -0,0 +1,242 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from run_context import RunContext
+from storage import SQLiteStore, data_path, pid_alive
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Id of the HTTP request (or job) being served, attached to every log record
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+REQUEST_ID_PATTERN = re.compile(r"^[\w.\-]{1,64}$")
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+FAST_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+SIZE_BUCKETS = (1000, 5000, 10000, 25000, 50000, 100000, 250000, 1000000)
+
+# name -> (type, help, histogram buckets)
+METRICS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    "media_kit_searches_total": ("counter", "Searches by mode, cache outcome and status", ()),
+    "media_kit_search_duration_seconds": ("histogram", "End-to-end search latency", DURATION_BUCKETS),
+    "media_kit_model_turns_total": ("counter", "Model calls made by the agent", ()),
+    "media_kit_model_turn_duration_seconds": ("histogram", "Latency of one model call", DURATION_BUCKETS),
+    "media_kit_model_tokens_total": ("counter", "Tokens used by model calls", ()),
+    "media_kit_tool_calls_total": ("counter", "Tool calls by tool and cache outcome", ()),
+    "media_kit_tool_call_duration_seconds": ("histogram", "Latency of one tool call", DURATION_BUCKETS),
+    "media_kit_tool_payload_chars": ("histogram", "Characters returned by scrape/search before condensing", SIZE_BUCKETS),
+    "media_kit_parse_duration_seconds": ("histogram", "Time spent extracting the JSON answer", FAST_BUCKETS),
+    "media_kit_budget_exhausted_total": ("counter", "Searches cut short by a budget", ()),
+    "media_kit_provider_retries_total": ("counter", "OpenAI / Firecrawl requests retried or given up by the rate limiter", ()),
+    "media_kit_refresh_total": ("counter", "Outlets checked by the background refresh scheduler, by reason and outcome", ()),
+}
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def new_request_id(header_value: Optional[str]) -> str:
+    """Use the caller's X-Request-ID when it looks sane, otherwise generate one"""
+    if header_value and REQUEST_ID_PATTERN.match(header_value):
+        return header_value
+    return os.urandom(8).hex()
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds the current request id to log records (format with %(request_id)s)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+def install_log_filter() -> None:
+    """Attach RequestIdFilter to the root handlers so every module's records carry the id"""
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(f, RequestIdFilter) for f in handler.filters):
+            handler.addFilter(RequestIdFilter())
+
+
+class Metrics:
+    """Prometheus counters and histograms; each worker publishes a snapshot to SQLite so /metrics covers all workers"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS metric_snapshots (
+        pid INTEGER PRIMARY KEY,
+        snapshot TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str):
+        self.store = SQLiteStore(path, self.schema)
+        self._counters: Dict[LabelKey, float] = {}
+        # key -> [bucket counts..., sum, count]
+        self._histograms: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Metrics":
+        """Create the registry at METRICS_PATH (default: data directory)"""
+        return cls(os.getenv("METRICS_PATH") or data_path("metrics.sqlite3"))
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        buckets = METRICS[name][2]
+        key = self._key(name, labels)
+        with self._lock:
+            series = self._histograms.setdefault(key, [0.0] * (len(buckets) + 3))
+            # Non-cumulative per-bucket counts; the +Inf bucket is the last one before sum/count
+            series[bisect_left(buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def flush(self) -> None:
+        """Publish this worker's series for the other workers' /metrics"""
+        with self._lock:
+            snapshot = {
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [[name, list(labels), series] for (name, labels), series in self._histograms.items()],
+            }
+        try:
+            self.store.connection().execute(
+                "INSERT OR REPLACE INTO metric_snapshots (pid, snapshot, updated_at) VALUES (?, ?, ?)",
+                (os.getpid(), json.dumps(snapshot), time.time()),
+            )
+        except Exception as e:
+            logger.warning(f"[METRICS] Failed to publish snapshot: {e}")
+
+    def render(self) -> str:
+        """Prometheus text exposition of all live workers' series, summed"""
+        self.flush()
+        conn = self.store.connection()
+        counters: Dict[LabelKey, float] = {}
+        histograms: Dict[LabelKey, List[float]] = {}
+        for row in conn.execute("SELECT pid, snapshot FROM metric_snapshots").fetchall():
+            if not pid_alive(row["pid"]):
+                # A restarted worker starts from zero; Prometheus treats that as a counter reset
+                conn.execute("DELETE FROM metric_snapshots WHERE pid = ?", (row["pid"],))
+                continue
+            snapshot = json.loads(row["snapshot"])
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(label) for label in labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, series in snapshot["histograms"]:
+                key = (name, tuple(tuple(label) for label in labels))
+                merged = histograms.setdefault(key, [0.0] * len(series))
+                histograms[key] = [a + b for a, b in zip(merged, series)]
+
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (series_name, labels), value in sorted(counters.items()):
+                    if series_name == name:
+                        lines.append(f"{name}{self._format_labels(labels)} {value:g}")
+                continue
+            for (series_name, labels), series in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0.0
+                for bound, count in zip([*buckets, "+Inf"], series[:-2]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else f"{bound:g}"
+                    lines.append(f"{name}_bucket{self._format_labels(labels + (('le', le),))} {cumulative:g}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {series[-2]:g}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {series[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+        if not labels:
+            return ""
+        parts = []
+        for k, v in labels:
+            v = v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            parts.append(f'{k}="{v}"')
+        return "{" + ",".join(parts) + "}"
+
+
+def record_run(
+    metrics: Metrics,
+    run: RunContext,
+    media_name: str,
+    strict_mode: bool,
+    cache_status: str,
+    status: str,
+    speed: str = "quality",
+) -> None:
+    """
+    Turn a finished run's trace into metrics and one structured [TRACE] log line
+
+    Args:
+        metrics: Registry to update
+        run: RunContext whose emitted events form the trace
+        media_name: Searched media name
+        strict_mode: Search mode (reported as "cascade" once run.cascaded is set)
+        cache_status: HIT, MISS, COALESCED, BYPASS, REFRESH or NONE (failed before a result)
+        status: found, not_found, error (agent answered with an error), failed, cancelled or rejected
+        speed: Model tier ("quality" or "fast")
+    """
+    mode = "cascade" if run.cascaded else "strict" if strict_mode else "flexible"
+    spans = list(run.trace)
+    for span in spans:
+        seconds = (span.get("duration_ms") or 0) / 1000
+        if span["type"] == "model_turn":
+            model = span.get("model") or "unknown"
+            metrics.inc("media_kit_model_turns_total", mode=mode, model=model)
+            metrics.observe("media_kit_model_turn_duration_seconds", seconds, mode=mode, model=model)
+            for direction in ("input", "output"):
+                tokens = span.get(f"{direction}_tokens")
+                if tokens:
+                    metrics.inc("media_kit_model_tokens_total", tokens, mode=mode, model=model, direction=direction)
+        elif span["type"] == "tool_call":
+            tool = span.get("tool") or "unknown"
+            cached = "true" if span.get("cached") else "false"
+            metrics.inc("media_kit_tool_calls_total", mode=mode, tool=tool, cached=cached)
+            metrics.observe("media_kit_tool_call_duration_seconds", seconds, mode=mode, tool=tool, cached=cached)
+            if span.get("content_length") is not None:
+                metrics.observe("media_kit_tool_payload_chars", span["content_length"], tool=tool)
+        elif span["type"] == "parse":
+            metrics.observe("media_kit_parse_duration_seconds", seconds, mode=mode)
+        elif span["type"] == "retry":
+            outcome = "gave_up" if span.get("gave_up") else "retried"
+            metrics.inc("media_kit_provider_retries_total", provider=span["provider"], status=span["status"], outcome=outcome)
+
+    if run.budget_hit:
+        metrics.inc("media_kit_budget_exhausted_total", mode=mode, budget=run.budget_hit)
+    metrics.inc("media_kit_searches_total", mode=mode, speed=speed, cache=cache_status, status=status)
+    metrics.observe("media_kit_search_duration_seconds", run.elapsed_ms / 1000, mode=mode, speed=speed, cache=cache_status)
+    metrics.flush()
+
+    logger.info("[TRACE] " + json.dumps({
+        "request_id": request_id.get(),
+        "media_name": media_name,
+        "canonical_name": run.canonical_name,
+        "mode": mode,
+        "speed": speed,
+        "cache": cache_status,
+        "status": status,
+        "elapsed_ms": round(run.elapsed_ms, 1),
+        "model_turns": run.model_turns,
+        "tool_calls": run.tool_calls,
+        "tokens": run.tokens,
+        "budget_exhausted": run.budget_hit,
+        "spans": spans,
+    }, ensure_ascii=False))
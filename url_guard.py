@@ -0,0 +1,93 @@
+from typing import Set
+from urllib.parse import urlsplit
+import ipaddress
+import logging
+import os
+import socket
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Second-level labels under a country TLD that are not registrable themselves ("co.kr", "or.kr", "co.uk", ...)
+PUBLIC_SECOND_LEVEL_LABELS = {
+    "co", "or", "go", "ac", "ne", "re", "pe", "ms", "hs", "es", "sc", "kg", "mil",
+    "com", "net", "org", "edu", "gov",
+}
+
+
+class UnsafeURLError(requests.exceptions.InvalidURL):
+    """Raised before a request to a URL whose host is not a public internet address"""
+
+
+def registrable_domain(host: str) -> str:
+    """Site a host belongs to: "www.joongang.co.kr" -> "joongang.co.kr", "ad.chosun.com" -> "chosun.com" """
+    host = (host or "").lower().rstrip(".")
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in PUBLIC_SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def same_site(url: str, other: str) -> bool:
+    """Whether two URLs (or hosts) are on the same registrable domain"""
+    def host(value: str) -> str:
+        return urlsplit(value if "://" in value else f"https://{value}").hostname or ""
+    return registrable_domain(host(url)) == registrable_domain(host(other))
+
+
+def allowed_hosts() -> Set[str]:
+    """Hosts exempt from the guard (URL_GUARD_ALLOWED_HOSTS, comma separated; e.g. a local benchmark server)"""
+    return {host.strip().lower() for host in os.getenv("URL_GUARD_ALLOWED_HOSTS", "").split(",") if host.strip()}
+
+
+def check_public_url(url: str) -> None:
+    """
+    Refuse URLs that would make the server request itself or its network
+
+    Args:
+        url: URL about to be requested (every redirect hop is checked separately)
+
+    Raises:
+        UnsafeURLError: The scheme is not http(s), or the host resolves to a loopback, private,
+            link-local (cloud metadata), reserved or otherwise non-public address
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeURLError(f"Refusing non-http URL: {url}")
+    host = parts.hostname.lower()
+    if host in allowed_hosts():
+        return
+    try:
+        infos = socket.getaddrinfo(host, parts.port or (443 if parts.scheme == "https" else 80), proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError) as e:
+        raise requests.exceptions.ConnectionError(f"Cannot resolve {host}: {e}")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if not address.is_global or address.is_multicast:
+            logger.warning(f"[GUARD] Refusing {url}: {host} resolves to {address}")
+            raise UnsafeURLError(f"Refusing {url}: {host} resolves to non-public address {address}")
+
+
+class GuardedAdapter(HTTPAdapter):
+    """HTTPAdapter that checks every request it sends, redirect hops included, with check_public_url"""
+
+    def send(self, request, **kwargs):
+        check_public_url(request.url)
+        return super().send(request, **kwargs)
+
+
+def guarded_session() -> requests.Session:
+    """A new requests.Session that only reaches public http(s) hosts"""
+    session = requests.Session()
+    adapter = GuardedAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session